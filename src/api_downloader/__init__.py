@@ -3,12 +3,13 @@ Hyperliquid REST API Downloader Package
 """
 
 from .downloader import HyperliquidClient
-from .storage import save_snapshot, ensure_directory
+from .storage import save_snapshot, save_snapshot_stream, ensure_directory
 from .utils import to_date_range, to_hour_list, setup_logging
 
 __all__ = [
     "HyperliquidClient",
     "save_snapshot",
+    "save_snapshot_stream",
     "ensure_directory",
     "to_date_range",
     "to_hour_list",
@@ -4,14 +4,139 @@ Command-line interface for Hyperliquid data downloader.
 
 import argparse
 import logging
-from typing import List
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import product
+from typing import List, Tuple
 
 from .downloader import HyperliquidClient, HyperliquidAPIError
-from .storage import save_snapshot
+from .storage import save_snapshot, save_snapshot_stream, snapshot_path
 from .utils import to_date_range, to_hour_list, setup_logging
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = 32
+
+
+def _fetch_one(
+    client: HyperliquidClient,
+    symbol: str,
+    date: str,
+    hour: int,
+    output_dir: str,
+    keep_compressed: bool = False
+) -> str:
+    """
+    Fetch and save a single hourly snapshot.
+    
+    Nothing is requested if the snapshot is already on disk.
+    
+    Args:
+        client: Shared API client
+        symbol: Trading symbol
+        date: Date in YYYYMMDD format
+        hour: Hour of day (0-23)
+        output_dir: Output directory for downloaded data
+        keep_compressed: Store the LZ4 payload as-is (.json.lz4)
+        
+    Returns:
+        Task status: "completed", "skipped" or "failed"
+    """
+    try:
+        # Fetch and decompress straight to disk; interrupted bodies are
+        # re-requested by the client
+        saved = save_snapshot_stream(
+            symbol, date, hour,
+            lambda dst: client.download_l2_snapshot(
+                symbol, date, hour, dst, decompress=not keep_compressed
+            ),
+            output_dir,
+            compressed=keep_compressed
+        )
+        
+        if saved is None:
+            # Already on disk, or not available
+            return "skipped"
+        return "completed"
+        
+    except HyperliquidAPIError as e:
+        logger.error("Failed: %s %s %02d - %s", symbol, date, hour, e)
+        return "failed"
+        
+    except Exception as e:
+        logger.error(
+            "Unexpected error for %s %s %02d: %s", symbol, date, hour, e
+        )
+        return "failed"
+
+
+def _fetch_day(
+    client: HyperliquidClient,
+    symbol: str,
+    date: str,
+    hours: List[int],
+    output_dir: str
+) -> Tuple[Counter, List[int]]:
+    """
+    Fetch and save all requested hours of a day with a single bulk request.
+    
+    Hours already on disk are counted as skipped and left out of the request.
+    
+    If the day cannot be fetched in bulk, its hours are returned for the
+    caller to fetch one by one as separate tasks.
+    
+    Args:
+        client: Shared API client
+        symbol: Trading symbol
+        date: Date in YYYYMMDD format
+        hours: Hours of day (0-23)
+        output_dir: Output directory for downloaded data
+        
+    Returns:
+        Counter of task statuses, and the hours still to fetch per hour
+    """
+    results = Counter()
+    
+    # Only request the hours not already on disk
+    missing = [
+        hour for hour in hours
+        if not snapshot_path(symbol, date, hour, output_dir).exists()
+    ]
+    results["skipped"] += len(hours) - len(missing)
+    if not missing:
+        return results, []
+    hours = missing
+    
+    try:
+        snapshots = client.get_l2_snapshots_bulk(symbol, date, hours)
+    except HyperliquidAPIError as e:
+        logger.error("Failed: %s %s - %s", symbol, date, e)
+        results["failed"] += len(hours)
+        return results, []
+    except Exception as e:
+        logger.error("Unexpected error for %s %s: %s", symbol, date, e)
+        results["failed"] += len(hours)
+        return results, []
+    
+    if snapshots is None:
+        # No bulk result - per-hour path
+        return results, hours
+    
+    for hour, data in snapshots:
+        try:
+            if save_snapshot(symbol, date, hour, data, output_dir) is None:
+                # Already on disk
+                results["skipped"] += 1
+            else:
+                results["completed"] += 1
+        except Exception as e:
+            logger.error(
+                "Unexpected error for %s %s %02d: %s", symbol, date, hour, e
+            )
+            results["failed"] += 1
+    
+    return results, []
+
 
 def download_data(
     symbols: List[str],
@@ -19,11 +144,19 @@ def download_data(
     end_date: str,
     hours: str,
     output_dir: str,
-    log_level: str
+    log_level: str,
+    max_workers: int = DEFAULT_WORKERS,
+    bulk: bool = False,
+    keep_compressed: bool = False
 ) -> None:
     """
     Download historical L2 data for specified symbols, dates, and hours.
     
+    Requests are I/O-bound, so symbol/date/hour tasks are fetched
+    concurrently on a thread pool sharing a single client session. With
+    bulk enabled, each symbol/date task requests all hours at once; days
+    that cannot be fetched in bulk are queued back as per-hour tasks.
+    
     Args:
         symbols: List of trading symbols
         start_date: Start date (YYYY-MM-DD or YYYYMMDD)
@@ -31,66 +164,78 @@ def download_data(
         hours: Hour specification (e.g., "0-5,12" or "all")
         output_dir: Output directory for downloaded data
         log_level: Logging level
+        max_workers: Number of concurrent download workers
+        bulk: Request all hours of a day in a single call
+        keep_compressed: Store LZ4 payloads as-is instead of decompressing
+                         (per-hour requests only)
     """
     setup_logging(log_level)
     
+    if bulk and keep_compressed:
+        raise ValueError("keep_compressed is not supported with bulk requests")
+    
     # Parse inputs
     dates = to_date_range(start_date, end_date)
     hour_list = to_hour_list(hours)
     
-    logger.info(f"Symbols: {', '.join(symbols)}")
-    logger.info(f"Dates: {dates[0]} to {dates[-1]} ({len(dates)} days)")
-    logger.info(f"Hours: {hour_list}")
-    logger.info(f"Output: {output_dir}")
+    logger.info("Symbols: %s", ", ".join(symbols))
+    logger.info("Dates: %s to %s (%d days)", dates[0], dates[-1], len(dates))
+    logger.info("Hours: %s", hour_list)
+    logger.info("Output: %s", output_dir)
     
     # Statistics
     total_tasks = len(symbols) * len(dates) * len(hour_list)
-    completed = 0
-    failed = 0
-    skipped = 0
+    results = Counter()
     
-    logger.info(f"Total tasks: {total_tasks}")
+    logger.info("Total tasks: %d", total_tasks)
+    logger.info("Workers: %d", max_workers)
     
     # Download data
     with HyperliquidClient() as client:
-        for symbol in symbols:
-            for date in dates:
-                for hour in hour_list:
-                    try:
-                        # Fetch data
-                        data = client.get_l2_snapshot(symbol, date, hour)
-                        
-                        if data is None:
-                            # Data not available
-                            skipped += 1
-                            logger.debug(
-                                f"Skipped: {symbol} {date} {hour:02d} "
-                                f"(not available)"
-                            )
-                        else:
-                            # Save to disk
-                            save_snapshot(symbol, date, hour, data, output_dir)
-                            completed += 1
-                            
-                    except HyperliquidAPIError as e:
-                        logger.error(
-                            f"Failed: {symbol} {date} {hour:02d} - {e}"
-                        )
-                        failed += 1
-                        
-                    except Exception as e:
-                        logger.error(
-                            f"Unexpected error for {symbol} {date} {hour:02d}: {e}"
-                        )
-                        failed += 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit_hour(symbol: str, date: str, hour: int):
+                return executor.submit(
+                    _fetch_one, client, symbol, date, hour, output_dir,
+                    keep_compressed
+                )
+            
+            # Bulk day futures map to their (symbol, date)
+            day_tasks = {}
+            if bulk:
+                for symbol, date in product(symbols, dates):
+                    future = executor.submit(
+                        _fetch_day, client, symbol, date, hour_list, output_dir
+                    )
+                    day_tasks[future] = (symbol, date)
+                pending = set(day_tasks)
+            else:
+                pending = {
+                    submit_hour(symbol, date, hour)
+                    for symbol, date, hour in product(symbols, dates, hour_list)
+                }
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future not in day_tasks:
+                        results[future.result()] += 1
+                        continue
+                    
+                    day_results, fallback_hours = future.result()
+                    results.update(day_results)
+                    # Fan the day's hours out across the pool
+                    symbol, date = day_tasks.pop(future)
+                    pending.update(
+                        submit_hour(symbol, date, hour) for hour in fallback_hours
+                    )
     
     # Summary
     logger.info("=" * 60)
     logger.info("Download Summary:")
-    logger.info(f"  Total tasks:  {total_tasks}")
-    logger.info(f"  Completed:    {completed}")
-    logger.info(f"  Skipped:      {skipped}")
-    logger.info(f"  Failed:       {failed}")
+    logger.info("  Total tasks:  %d", total_tasks)
+    logger.info("  Completed:    %d", results["completed"])
+    logger.info("  Skipped:      %d", results["skipped"])
+    logger.info("  Failed:       %d", results["failed"])
     logger.info("=" * 60)
 
 
@@ -143,6 +288,25 @@ Examples:
         help="Output directory. Default: data/raw/api"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of concurrent downloads. Default: {DEFAULT_WORKERS}"
+    )
+    
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Request all hours of a day in one call (falls back to per-hour)"
+    )
+    
+    parser.add_argument(
+        "--keep-compressed",
+        action="store_true",
+        help="Store raw LZ4 payloads (.json.lz4) instead of decompressing"
+    )
+    
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -152,6 +316,9 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.bulk and args.keep_compressed:
+        parser.error("--keep-compressed cannot be combined with --bulk")
+    
     try:
         download_data(
             symbols=args.symbols,
@@ -159,10 +326,13 @@ Examples:
             end_date=args.end_date,
             hours=args.hours,
             output_dir=args.out,
-            log_level=args.log_level
+            log_level=args.log_level,
+            max_workers=args.workers,
+            bulk=args.bulk,
+            keep_compressed=args.keep_compressed
         )
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         raise
 
 
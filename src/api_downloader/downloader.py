@@ -2,19 +2,30 @@
 Hyperliquid REST API Client with retry logic and error handling.
 """
 
+import math
 import time
 import random
 import logging
+import threading
 import requests
 import lz4.frame
-from typing import Optional, Dict, Any
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Tuple, BinaryIO
 
 logger = logging.getLogger(__name__)
 
+# Block size for streamed downloads (one LZ4 block at the default settings)
+STREAM_CHUNK_SIZE = 1 << 16
+
 
 class HyperliquidAPIError(Exception):
     """Custom exception for Hyperliquid API errors."""
-    pass
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        # HTTP status of the rejected response, if there was one
+        self.status_code = status_code
 
 
 class HyperliquidClient:
@@ -23,7 +34,10 @@ class HyperliquidClient:
     
     Supports:
     - L2 orderbook snapshots
+    - Pooled keep-alive connections
+    - Multi-hour bulk requests
     - Automatic retry with exponential backoff
+    - Retry-After aware rate limiting shared across threads
     - LZ4 decompression
     """
     
@@ -31,6 +45,8 @@ class HyperliquidClient:
     MAX_RETRIES = 10
     INITIAL_BACKOFF = 1.0
     MAX_BACKOFF = 60.0
+    POOL_CONNECTIONS = 32
+    POOL_MAXSIZE = 64
     
     def __init__(self, timeout: int = 30):
         """
@@ -45,6 +61,27 @@ class HyperliquidClient:
             "User-Agent": "HyperliquidDownloader/1.0",
             "Accept": "application/json",
         })
+        
+        # Keep-alive pool sized for concurrent workers; retries are
+        # handled by _request, so the adapter never retries.
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=0,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Cleared once the server rejects a bulk request as unsupported
+        self.bulk_supported = True
+        
+        # Shared rate-limit gate: after a 429, every worker using this
+        # client waits until this monotonic deadline before its next request
+        self._ratelimit_until = 0.0
+        self._ratelimit_lock = threading.Lock()
+        
+        # One reusable LZ4 decompression context per worker thread
+        self._local = threading.local()
     
     def get_l2_snapshot(
         self, 
@@ -72,54 +109,286 @@ class HyperliquidClient:
             "date": date,
             "hour": hour,
         }
+        label = f"{symbol} {date} {hour:02d}"
+        
+        response = self._request("GET", endpoint, label, params=params)
+        if response is None:
+            return None
+        
+        # Decompress LZ4 data
+        try:
+            decompressor = self._decompressor()
+            decompressed = decompressor.decompress(response.content)
+            if not decompressor.eof:
+                raise ValueError("Truncated LZ4 frame")
+        except Exception as e:
+            logger.error("LZ4 decompression failed: %s", e)
+            raise HyperliquidAPIError(f"Decompression error: {e}")
+        
+        logger.info("Successfully fetched %s", label)
+        return decompressed
+    
+    def stream_l2_snapshot(
+        self,
+        symbol: str,
+        date: str,
+        hour: int
+    ) -> Optional[requests.Response]:
+        """
+        Open a streaming request for an L2 orderbook snapshot.
+        
+        The body is left unread so it can be decompressed straight to disk
+        without buffering the compressed and decompressed payloads in
+        memory. Reading the body happens outside the retry loop; use
+        download_l2_snapshot to have interrupted bodies re-requested.
+        
+        Args:
+            symbol: Trading symbol (e.g., "SOL", "BTC")
+            date: Date in YYYYMMDD format
+            hour: Hour of day (0-23)
+            
+        Returns:
+            Open response with an LZ4-compressed body, or None if not
+            available. The caller is responsible for closing it.
+            
+        Raises:
+            HyperliquidAPIError: On unrecoverable API errors
+        """
+        endpoint = f"{self.BASE_URL}/historical/l2book"
+        params = {
+            "symbol": symbol,
+            "date": date,
+            "hour": hour,
+        }
+        label = f"{symbol} {date} {hour:02d}"
+        
+        return self._request(
+            "GET", endpoint, label, params=params, stream=True
+        )
+    
+    def download_l2_snapshot(
+        self,
+        symbol: str,
+        date: str,
+        hour: int,
+        dst: BinaryIO,
+        decompress: bool = True
+    ) -> bool:
+        """
+        Stream an L2 orderbook snapshot into an open binary file.
+        
+        The body is decompressed chunk by chunk as it arrives (or written
+        as-is with decompress=False), so memory use is bounded by one chunk.
+        If the connection drops or times out mid-body, the snapshot is
+        requested again and dst is truncated and rewritten from the start.
+        
+        Args:
+            symbol: Trading symbol (e.g., "SOL", "BTC")
+            date: Date in YYYYMMDD format
+            hour: Hour of day (0-23)
+            dst: Seekable binary file to write to
+            decompress: Decompress the LZ4 payload before writing
+            
+        Returns:
+            True once the whole snapshot is written, False if not available
+            
+        Raises:
+            HyperliquidAPIError: On unrecoverable API errors
+        """
+        label = f"{symbol} {date} {hour:02d}"
+        
+        for attempt in range(self.MAX_RETRIES):
+            response = self.stream_l2_snapshot(symbol, date, hour)
+            if response is None:
+                return False
+            
+            dst.seek(0)
+            dst.truncate()
+            try:
+                with response:
+                    self._write_body(response, dst, decompress)
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                backoff = self._calculate_backoff(attempt)
+                logger.warning(
+                    "Download of %s interrupted: %s. Retrying in %.2fs...",
+                    label, e, backoff
+                )
+                time.sleep(backoff)
+                continue
+            
+            logger.info("Successfully fetched %s", label)
+            return True
+        
+        # Max retries exceeded
+        raise HyperliquidAPIError(
+            f"Max retries ({self.MAX_RETRIES}) exceeded for {label}"
+        )
+    
+    def _write_body(
+        self,
+        response: requests.Response,
+        dst: BinaryIO,
+        decompress: bool
+    ) -> None:
+        """
+        Copy a streamed LZ4 response body into dst.
+        
+        Args:
+            response: Open streaming response
+            dst: Binary file to write to
+            decompress: Decompress the payload before writing
+        """
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        if not decompress:
+            for chunk in chunks:
+                dst.write(chunk)
+            return
+        
+        decompressor = self._decompressor()
+        try:
+            for chunk in chunks:
+                dst.write(decompressor.decompress(chunk))
+            if not decompressor.eof:
+                raise ValueError("Truncated LZ4 frame")
+        except (RuntimeError, ValueError) as e:
+            logger.error("LZ4 decompression failed: %s", e)
+            raise HyperliquidAPIError(f"Decompression error: {e}")
+    
+    def get_l2_snapshots_bulk(
+        self,
+        symbol: str,
+        date: str,
+        hours: List[int]
+    ) -> Optional[List[Tuple[int, bytes]]]:
+        """
+        Fetch several hours of L2 snapshots for a symbol and date in one request.
+        
+        The response body is expected to hold one LZ4 frame per requested
+        hour, concatenated in request order.
+        
+        Args:
+            symbol: Trading symbol (e.g., "SOL", "BTC")
+            date: Date in YYYYMMDD format
+            hours: Hours of day (0-23)
+            
+        Returns:
+            List of (hour, decompressed JSON bytes) tuples, or None if the
+            day cannot be fetched in bulk. Callers should fall back to
+            per-hour requests in that case. A 400/405 means bulk queries
+            are unsupported and disables them for this client; a 404 only
+            affects this day (e.g. a day without data).
+            
+        Raises:
+            HyperliquidAPIError: On unrecoverable API errors
+        """
+        if not self.bulk_supported:
+            return None
+        
+        endpoint = f"{self.BASE_URL}/historical/l2book"
+        payload = {
+            "symbol": symbol,
+            "date": date,
+            "hours": list(hours),
+        }
+        label = f"{symbol} {date} ({len(hours)} hours)"
+        
+        try:
+            response = self._request("POST", endpoint, label, json=payload)
+        except HyperliquidAPIError as e:
+            if e.status_code not in (400, 405):
+                raise
+            logger.warning("Bulk queries not supported, using per-hour requests")
+            self.bulk_supported = False
+            return None
+        if response is None:
+            # Let the per-hour requests tell which hours exist
+            logger.info("No bulk data for %s, using per-hour requests", label)
+            return None
+        
+        try:
+            frames = self._split_frames(response.content)
+        except Exception as e:
+            logger.error("LZ4 decompression failed: %s", e)
+            raise HyperliquidAPIError(f"Decompression error: {e}")
+        
+        if len(frames) != len(hours):
+            raise HyperliquidAPIError(
+                f"Expected {len(hours)} frames for {label}, got {len(frames)}"
+            )
+        
+        logger.info("Successfully fetched %s", label)
+        return list(zip(hours, frames))
+    
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        label: str,
+        missing_statuses: Tuple[int, ...] = (404,),
+        **kwargs: Any
+    ) -> Optional[requests.Response]:
+        """
+        Issue a request with retry and exponential backoff.
         
+        Args:
+            method: HTTP method
+            endpoint: Request URL
+            label: Human-readable description for log messages
+            missing_statuses: Status codes meaning "not available"
+            **kwargs: Extra arguments for session.request
+            
+        Returns:
+            Successful (200) response, or None if not available
+            
+        Raises:
+            HyperliquidAPIError: On unrecoverable API errors
+        """
         for attempt in range(self.MAX_RETRIES):
+            self._wait_for_rate_limit()
             try:
                 logger.debug(
-                    f"Fetching L2 snapshot: {symbol} {date} {hour:02d} "
-                    f"(attempt {attempt + 1}/{self.MAX_RETRIES})"
+                    "Fetching L2 snapshot: %s (attempt %d/%d)",
+                    label, attempt + 1, self.MAX_RETRIES
                 )
                 
-                response = self.session.get(
+                response = self.session.request(
+                    method,
                     endpoint,
-                    params=params,
                     timeout=self.timeout,
+                    **kwargs,
                 )
                 
                 # Handle different status codes
                 if response.status_code == 200:
-                    # Decompress LZ4 data
-                    try:
-                        decompressed = lz4.frame.decompress(response.content)
-                        logger.info(
-                            f"Successfully fetched {symbol} {date} {hour:02d}"
-                        )
-                        return decompressed
-                    except Exception as e:
-                        logger.error(f"LZ4 decompression failed: {e}")
-                        raise HyperliquidAPIError(f"Decompression error: {e}")
+                    return response
                 
-                elif response.status_code == 404:
-                    logger.warning(
-                        f"Data not found: {symbol} {date} {hour:02d}"
-                    )
+                elif response.status_code in missing_statuses:
+                    response.close()
+                    logger.warning("Data not found: %s", label)
                     return None
                 
                 elif response.status_code == 429:
-                    # Rate limit - retry with backoff
-                    backoff = self._calculate_backoff(attempt)
-                    logger.warning(
-                        f"Rate limited. Retrying in {backoff:.2f}s..."
-                    )
-                    time.sleep(backoff)
+                    # Rate limit - honor Retry-After, else back off;
+                    # the wait is applied by the shared gate
+                    response.close()
+                    backoff = self._retry_after(response)
+                    if backoff is None:
+                        backoff = self._calculate_backoff(attempt)
+                    logger.warning("Rate limited. Retrying in %.2fs...", backoff)
+                    self._set_rate_limit(backoff)
                     continue
                 
                 elif response.status_code >= 500:
                     # Server error - retry
+                    response.close()
                     backoff = self._calculate_backoff(attempt)
                     logger.warning(
-                        f"Server error {response.status_code}. "
-                        f"Retrying in {backoff:.2f}s..."
+                        "Server error %d. Retrying in %.2fs...",
+                        response.status_code, backoff
                     )
                     time.sleep(backoff)
                     continue
@@ -127,19 +396,20 @@ class HyperliquidClient:
                 else:
                     # Other error
                     raise HyperliquidAPIError(
-                        f"API error {response.status_code}: {response.text}"
+                        f"API error {response.status_code}: {response.text}",
+                        status_code=response.status_code,
                     )
                     
             except requests.exceptions.Timeout:
                 backoff = self._calculate_backoff(attempt)
-                logger.warning(f"Request timeout. Retrying in {backoff:.2f}s...")
+                logger.warning("Request timeout. Retrying in %.2fs...", backoff)
                 time.sleep(backoff)
                 continue
                 
             except requests.exceptions.ConnectionError as e:
                 backoff = self._calculate_backoff(attempt)
                 logger.warning(
-                    f"Connection error: {e}. Retrying in {backoff:.2f}s..."
+                    "Connection error: %s. Retrying in %.2fs...", e, backoff
                 )
                 time.sleep(backoff)
                 continue
@@ -149,15 +419,94 @@ class HyperliquidClient:
                 raise
                 
             except Exception as e:
-                logger.error(f"Unexpected error: {e}")
+                logger.error("Unexpected error: %s", e)
                 raise HyperliquidAPIError(f"Unexpected error: {e}")
         
         # Max retries exceeded
         raise HyperliquidAPIError(
-            f"Max retries ({self.MAX_RETRIES}) exceeded for "
-            f"{symbol} {date} {hour:02d}"
+            f"Max retries ({self.MAX_RETRIES}) exceeded for {label}"
         )
     
+    def _decompressor(self) -> lz4.frame.LZ4FrameDecompressor:
+        """Return this thread's LZ4 decompressor, reset for a new frame."""
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = lz4.frame.LZ4FrameDecompressor()
+            self._local.decompressor = decompressor
+        else:
+            decompressor.reset()
+        return decompressor
+    
+    def _split_frames(self, payload: bytes) -> List[bytes]:
+        """
+        Decompress a body made of concatenated LZ4 frames.
+        
+        Args:
+            payload: Raw response body
+            
+        Returns:
+            Decompressed data for each frame, in order
+        """
+        frames = []
+        while payload:
+            decompressor = self._decompressor()
+            frames.append(decompressor.decompress(payload))
+            if not decompressor.eof:
+                raise ValueError("Truncated LZ4 frame")
+            payload = decompressor.unused_data
+        return frames
+    
+    def _wait_for_rate_limit(self) -> None:
+        """Sleep until the shared rate-limit deadline (if any) has passed."""
+        delay = self._ratelimit_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _set_rate_limit(self, backoff: float) -> None:
+        """
+        Push the shared rate-limit deadline out by backoff seconds.
+        
+        Args:
+            backoff: Seconds to hold off all requests
+        """
+        with self._ratelimit_lock:
+            self._ratelimit_until = max(
+                self._ratelimit_until, time.monotonic() + backoff
+            )
+    
+    @classmethod
+    def _retry_after(cls, response: requests.Response) -> Optional[float]:
+        """
+        Parse the Retry-After header of a response.
+        
+        The wait applies to every worker through the shared gate, so it is
+        capped at MAX_BACKOFF.
+        
+        Args:
+            response: HTTP response
+            
+        Returns:
+            Seconds to wait, or None if the header is missing or invalid
+        """
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        
+        try:
+            delay = float(value)
+        except ValueError:
+            # HTTP-date form
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            delay = retry_at.timestamp() - time.time()
+        
+        # inf/nan would stall (or crash) every worker waiting on the gate
+        if not math.isfinite(delay):
+            return None
+        return min(max(0.0, delay), cls.MAX_BACKOFF)
+    
     def _calculate_backoff(self, attempt: int) -> float:
         """
         Calculate exponential backoff with jitter.
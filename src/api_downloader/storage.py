@@ -3,16 +3,27 @@ Storage utilities for saving downloaded data to disk.
 """
 
 import logging
+import os
+import secrets
+import threading
 from pathlib import Path
-from typing import Union
+from typing import BinaryIO, Callable, Optional, Set, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Directories already created by this process, so repeat calls skip mkdir
+_created_dirs: Set[Path] = set()
+_created_dirs_lock = threading.Lock()
+
 
 def ensure_directory(path: Union[str, Path]) -> Path:
     """
     Ensure a directory exists, creating it if necessary.
     
+    Directories created once are remembered, so later calls for the same
+    path cost no filesystem syscalls. Writers that find a remembered
+    directory gone create it again (see _open_temp).
+    
     Args:
         path: Directory path
         
@@ -20,20 +31,137 @@ def ensure_directory(path: Union[str, Path]) -> Path:
         Path object for the directory
     """
     path = Path(path)
+    if path in _created_dirs:
+        return path
+    
     path.mkdir(parents=True, exist_ok=True)
+    with _created_dirs_lock:
+        _created_dirs.add(path)
     return path
 
 
+def _forget_directory(path: Path) -> None:
+    """Drop a directory from the created-directories cache."""
+    with _created_dirs_lock:
+        _created_dirs.discard(path)
+
+
+def _create_temp(directory: Path, prefix: str) -> Tuple[int, Path]:
+    """
+    Exclusively create a uniquely named temporary file in directory.
+    
+    Unlike tempfile.mkstemp (always 0600), the file gets the usual
+    0666 & ~umask mode, which the published snapshot keeps.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        tmp = directory / f"{prefix}{secrets.token_hex(8)}.part"
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+def _open_temp(file_path: Path) -> Tuple[BinaryIO, Path]:
+    """
+    Open a new temporary file next to file_path for writing.
+    
+    If the directory was removed after ensure_directory cached it, it is
+    created again.
+    
+    Args:
+        file_path: Final path the temporary file will be published to
+        
+    Returns:
+        Binary file object and the temporary file's path
+    """
+    directory = file_path.parent
+    prefix = f".{file_path.name}."
+    try:
+        fd, tmp = _create_temp(directory, prefix)
+    except FileNotFoundError:
+        _forget_directory(directory)
+        ensure_directory(directory)
+        fd, tmp = _create_temp(directory, prefix)
+    return os.fdopen(fd, 'wb'), tmp
+
+
+def _publish(tmp_path: Path, file_path: Path) -> bool:
+    """
+    Move a fully written temporary file into place, never overwriting.
+    
+    The hard link is atomic and fails if the target exists, so readers
+    only ever see complete files. The temporary file is removed either way.
+    
+    Args:
+        tmp_path: Finished temporary file
+        file_path: Final path
+        
+    Returns:
+        True if published, False if file_path already existed
+    """
+    try:
+        os.link(tmp_path, file_path)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        # Filesystem without hard links
+        if file_path.exists():
+            return False
+        os.replace(tmp_path, file_path)
+        return True
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def snapshot_path(
+    symbol: str,
+    date: str,
+    hour: int,
+    output_dir: Union[str, Path] = "data/raw/api",
+    compressed: bool = False
+) -> Path:
+    """
+    Build the on-disk path for an L2 snapshot, creating its directory.
+    
+    File structure: {output_dir}/{symbol}/{date}/{hour:02d}.json
+    (or {hour:02d}.json.lz4 for compressed snapshots)
+    
+    Args:
+        symbol: Trading symbol (e.g., "SOL")
+        date: Date in YYYYMMDD format
+        hour: Hour of day (0-23)
+        output_dir: Base output directory
+        compressed: Path for the raw LZ4 payload instead of plain JSON
+        
+    Returns:
+        Path to the snapshot file
+    """
+    # Create directory structure: symbol/date/
+    file_dir = Path(output_dir) / symbol / date
+    ensure_directory(file_dir)
+    
+    # File: hour.json / hour.json.lz4
+    suffix = ".json.lz4" if compressed else ".json"
+    return file_dir / f"{hour:02d}{suffix}"
+
+
 def save_snapshot(
     symbol: str,
     date: str,
     hour: int,
     data: bytes,
     output_dir: Union[str, Path] = "data/raw/api"
-) -> Path:
+) -> Optional[Path]:
     """
     Save L2 snapshot data to disk.
     
+    The data is written to a temporary file and published in one step, so
+    a partial write never leaves a file behind. Existing files are never
+    overwritten, so concurrent or repeated downloads of the same snapshot
+    are skipped.
+    
     File structure: {output_dir}/{symbol}/{date}/{hour:02d}.json
     
     Args:
@@ -44,24 +172,97 @@ def save_snapshot(
         output_dir: Base output directory
         
     Returns:
-        Path to the saved file
+        Path to the saved file, or None if it already existed
     """
-    output_dir = Path(output_dir)
+    file_path = snapshot_path(symbol, date, hour, output_dir)
+    if file_path.exists():
+        logger.info("Exists, skipping: %s", file_path)
+        return None
     
-    # Create directory structure: symbol/date/
-    file_dir = output_dir / symbol / date
-    ensure_directory(file_dir)
+    try:
+        f, tmp_path = _open_temp(file_path)
+        try:
+            with f:
+                f.write(data)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        if not _publish(tmp_path, file_path):
+            logger.info("Exists, skipping: %s", file_path)
+            return None
+        
+        logger.info("Saved: %s (%d bytes)", file_path, len(data))
+        return file_path
+        
+    except Exception as e:
+        logger.error("Failed to save %s: %s", file_path, e)
+        raise
+
+
+def save_snapshot_stream(
+    symbol: str,
+    date: str,
+    hour: int,
+    write: Callable[[BinaryIO], bool],
+    output_dir: Union[str, Path] = "data/raw/api",
+    compressed: bool = False
+) -> Optional[Path]:
+    """
+    Stream an L2 snapshot straight to disk.
+    
+    write receives the open destination file, fills it (e.g.
+    ``HyperliquidClient.download_l2_snapshot``) and returns False if
+    there is no snapshot to save. The file only appears under its final
+    name once write has finished, so an error or interrupt never leaves a
+    truncated snapshot behind. Existing files are never overwritten.
+    
+    File structure: {output_dir}/{symbol}/{date}/{hour:02d}.json
+    (or {hour:02d}.json.lz4 for compressed payloads)
+    
+    Args:
+        symbol: Trading symbol (e.g., "SOL")
+        date: Date in YYYYMMDD format
+        hour: Hour of day (0-23)
+        write: Callable writing the snapshot into a binary file
+        output_dir: Base output directory
+        compressed: Store under the .json.lz4 name
+        
+    Returns:
+        Path to the saved file, or None if it already existed or was not
+        available
+    """
+    file_path = snapshot_path(
+        symbol, date, hour, output_dir, compressed=compressed
+    )
     
-    # Save file: hour.json
-    file_path = file_dir / f"{hour:02d}.json"
+    if file_path.exists():
+        logger.info("Exists, skipping: %s", file_path)
+        return None
     
     try:
-        with open(file_path, 'wb') as f:
-            f.write(data)
+        dst, tmp_path = _open_temp(file_path)
+        try:
+            with dst:
+                available = write(dst)
+                size = dst.tell()
+        except BaseException:
+            # Covers interrupts too: nothing partial is left behind
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        if not available:
+            logger.debug("Not available, nothing saved: %s", file_path)
+            tmp_path.unlink(missing_ok=True)
+            return None
+        
+        if not _publish(tmp_path, file_path):
+            logger.info("Exists, skipping: %s", file_path)
+            return None
         
-        logger.info(f"Saved: {file_path} ({len(data)} bytes)")
+        logger.info("Saved: %s (%d bytes)", file_path, size)
         return file_path
         
     except Exception as e:
-        logger.error(f"Failed to save {file_path}: {e}")
+        logger.error("Failed to save %s: %s", file_path, e)
         raise
@@ -31,13 +31,10 @@ def to_date_range(start_date: str, end_date: str) -> List[str]:
         raise ValueError(f"Start date {start_date} is after end date {end_date}")
     
     # Generate range
-    dates = []
-    current = start
-    while current <= end:
-        dates.append(current.strftime("%Y%m%d"))
-        current += timedelta(days=1)
-    
-    return dates
+    return [
+        (start + timedelta(days=offset)).strftime("%Y%m%d")
+        for offset in range((end - start).days + 1)
+    ]
 
 
 def to_hour_list(hours: str) -> List[int]:
@@ -59,7 +56,8 @@ def to_hour_list(hours: str) -> List[int]:
     if hours.lower() == "all":
         return list(range(24))
     
-    result = []
+    # One bit per hour: ranges set contiguous runs, duplicates fold away
+    mask = 0
     for part in hours.split(","):
         part = part.strip()
         if "-" in part:
@@ -68,15 +66,16 @@ def to_hour_list(hours: str) -> List[int]:
             start, end = int(start), int(end)
             if not (0 <= start <= 23 and 0 <= end <= 23):
                 raise ValueError(f"Hours must be 0-23, got {start}-{end}")
-            result.extend(range(start, end + 1))
+            if start <= end:
+                mask |= (1 << (end + 1)) - (1 << start)
         else:
             # Single hour
             hour = int(part)
             if not (0 <= hour <= 23):
                 raise ValueError(f"Hour must be 0-23, got {hour}")
-            result.append(hour)
+            mask |= 1 << hour
     
-    return sorted(set(result))
+    return [hour for hour in range(24) if mask >> hour & 1]
 
 
 def _parse_date(date_str: str) -> datetime:
@@ -5,39 +5,195 @@ import joblib
 from pathlib import Path
 import logging
 import matplotlib.pyplot as plt
+from src.utils.artifacts import latest_artifact
+from src.utils.jit import njit
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INITIAL_CASH = 10000.0 # Starting capital
+
+# Trade codes used by the simulation kernel
+SIDE_BUY, SIDE_SELL = 0, 1
+REASON_NONE, REASON_TP, REASON_SL, REASON_TIME, REASON_SIGNAL, REASON_END = range(6)
+SIDE_LABELS = np.array(['BUY', 'SELL'], dtype=object)
+REASON_LABELS = np.array([np.nan, 'TP', 'SL', 'Time', 'Signal', 'End'], dtype=object)
+
+
+@njit(cache=True)
+def _simulate(probs, bid, ask, ts_ns, cash, buy_threshold, exit_threshold,
+              stop_loss, take_profit, max_hold_ns, fee_rate):
+    """
+    Long-only simulation over plain arrays.
+    
+    Returns the per-row equity curve, the final cash balance and the trade log
+    as parallel arrays (row index, side, price, size, fee, pnl, reason); only
+    the first n_trades entries of the trade arrays are valid.
+    """
+    n = len(probs)
+    equity = np.empty(n)
+    
+    # At most one trade per row plus the final close
+    max_trades = n + 1
+    trade_idx = np.empty(max_trades, dtype=np.int64)
+    trade_side = np.empty(max_trades, dtype=np.int8)
+    trade_price = np.empty(max_trades)
+    trade_size = np.empty(max_trades)
+    trade_fee = np.empty(max_trades)
+    trade_pnl = np.empty(max_trades)
+    trade_reason = np.empty(max_trades, dtype=np.int8)
+    n_trades = 0
+    
+    position = 0 # 0: Flat, 1: Long
+    entry_price = 0.0
+    entry_time = 0
+    holdings = 0.0
+    size = 0.0
+    
+    for i in range(n):
+        # Mark to Market
+        equity[i] = cash + (holdings * bid[i] if holdings > 0 else 0.0)
+        
+        if position == 0:
+            if probs[i] > buy_threshold:
+                # BUY
+                # Assume fill at Ask
+                buy_price = ask[i]
+                # Buy max possible
+                size = (cash * 0.99) / buy_price # Leave buffer for fees
+                cost = size * buy_price
+                fee = cost * fee_rate
+                
+                cash -= (cost + fee)
+                holdings = size
+                position = 1
+                entry_price = buy_price
+                entry_time = ts_ns[i]
+                
+                trade_idx[n_trades] = i
+                trade_side[n_trades] = SIDE_BUY
+                trade_price[n_trades] = buy_price
+                trade_size[n_trades] = size
+                trade_fee[n_trades] = fee
+                trade_pnl[n_trades] = np.nan
+                trade_reason[n_trades] = REASON_NONE
+                n_trades += 1
+        
+        elif position == 1:
+            # Check exit conditions
+            pct_change = (bid[i] - entry_price) / entry_price
+            time_held = ts_ns[i] - entry_time
+            
+            reason = REASON_NONE
+            
+            if pct_change >= take_profit:
+                reason = REASON_TP
+            elif pct_change <= -stop_loss:
+                reason = REASON_SL
+            elif time_held >= max_hold_ns:
+                reason = REASON_TIME
+            elif probs[i] < exit_threshold:
+                reason = REASON_SIGNAL
+            
+            if reason != REASON_NONE:
+                # SELL
+                sell_price = bid[i]
+                revenue = holdings * sell_price
+                fee = revenue * fee_rate
+                
+                cash += (revenue - fee)
+                holdings = 0.0
+                position = 0
+                
+                trade_idx[n_trades] = i
+                trade_side[n_trades] = SIDE_SELL
+                trade_price[n_trades] = sell_price
+                trade_size[n_trades] = holdings # Note: this is 0 now, should log previous size
+                trade_fee[n_trades] = fee
+                trade_pnl[n_trades] = revenue - fee - (entry_price * size + (entry_price * size * fee_rate)) # Approx PnL
+                trade_reason[n_trades] = reason
+                n_trades += 1
+    
+    # Final Close
+    if position == 1:
+        sell_price = bid[n - 1]
+        revenue = holdings * sell_price
+        fee = revenue * fee_rate
+        cash += (revenue - fee)
+        
+        trade_idx[n_trades] = n - 1
+        trade_side[n_trades] = SIDE_SELL
+        trade_price[n_trades] = sell_price
+        trade_size[n_trades] = np.nan
+        trade_fee[n_trades] = np.nan
+        trade_pnl[n_trades] = np.nan
+        trade_reason[n_trades] = REASON_END
+        n_trades += 1
+    
+    return (equity, cash, n_trades, trade_idx, trade_side, trade_price,
+            trade_size, trade_fee, trade_pnl, trade_reason)
+
+
 class Backtester:
-    def __init__(self, models_dir: str = "models", features_dir: str = "data/features"):
+    def __init__(self, models_dir: str = "models", features_dir: str = "data/features",
+                 quantize: bool = False):
         self.models_dir = Path(models_dir)
         self.features_dir = Path(features_dir)
         self.model = None
         self.scaler = None
         self.fee_rate = 0.00025 # 2.5 bps taker fee
+        self.quantize = quantize # Score with int8 weights and inputs
+        self.weights_q = None
+        self.weights_scale = 1.0
 
     def load_latest_model(self):
         # Find latest model files
-        model_files = sorted(list(self.models_dir.glob("lr_model_*.pkl")))
-        scaler_files = sorted(list(self.models_dir.glob("scaler_*.pkl")))
+        model_file = latest_artifact(self.models_dir, "lr_model_")
+        scaler_file = latest_artifact(self.models_dir, "scaler_")
         
-        if not model_files or not scaler_files:
+        if model_file is None or scaler_file is None:
             raise FileNotFoundError("No model or scaler found.")
             
-        self.model = joblib.load(model_files[-1])
-        self.scaler = joblib.load(scaler_files[-1])
-        logger.info(f"Loaded model: {model_files[-1].name}")
+        # Memory-map the stored arrays instead of copying them in
+        self.model = joblib.load(model_file.path, mmap_mode='r')
+        self.scaler = joblib.load(scaler_file.path, mmap_mode='r')
+        logger.info("Loaded model: %s", model_file.name)
+        
+        if self.quantize:
+            self.quantize_weights()
+
+    def quantize_weights(self):
+        # Symmetric per-tensor int8 quantization of the coefficients
+        coef = self.model.coef_.ravel()
+        max_abs = np.max(np.abs(coef))
+        self.weights_scale = max_abs / 127 if max_abs > 0 else 1.0
+        self.weights_q = np.round(coef / self.weights_scale).astype(np.int8)
+
+    def quantized_logits(self, X: np.ndarray) -> np.ndarray:
+        # Quantize the scaled inputs the same way, accumulate in int32 and
+        # dequantize once per row
+        max_abs = np.max(np.abs(X))
+        x_scale = max_abs / 127 if max_abs > 0 else 1.0
+        X_q = np.clip(np.rint(X / x_scale), -127, 127).astype(np.int8)
+        acc = X_q.astype(np.int32) @ self.weights_q.astype(np.int32)
+        dequant = np.float32(x_scale * self.weights_scale)
+        return acc.astype(np.float32) * dequant + np.float32(self.model.intercept_[0])
 
     def load_test_data(self, coin: str, date_str: str):
         file_path = self.features_dir / date_str / f"{coin}_features.parquet"
-        df = pl.read_parquet(file_path).to_pandas()
-        df = df.sort_values("timestamp")
+        lf = pl.scan_parquet(file_path)
         
         # Use last 15% as test set to match training split
-        n = len(df)
+        n = lf.select(pl.len()).collect().item() # From the Parquet metadata
         test_start = int(n * 0.85)
-        return df.iloc[test_start:].reset_index(drop=True)
+        
+        # Sort and slice in Polars, so only the test rows reach pandas
+        df = (
+            lf.sort("timestamp", maintain_order=True)
+            .slice(test_start)
+            .collect(engine="streaming")
+        )
+        return df.to_pandas()
 
     def run_backtest(self, coin: str, date_str: str):
         if self.model is None:
@@ -46,118 +202,62 @@ class Backtester:
         df = self.load_test_data(coin, date_str)
         
         # Prepare features
-        drop_cols = ["timestamp", "coin", "target"]
-        feature_cols = [c for c in df.columns if c not in drop_cols]
-        X = df[feature_cols]
-        
-        # Scale
-        X_scaled = self.scaler.transform(X)
+        drop_cols = {"timestamp", "coin", "target"}
+        col_positions = [i for i, c in enumerate(df.columns) if c not in drop_cols]
+        # Fresh float32 block, filled column by column straight from the frame's
+        # arrays (no intermediate DataFrame) and scaled in place below.
+        # Column-major so each column is written contiguously.
+        X = np.empty((len(df), len(col_positions)), dtype=np.float32, order='F')
+        for j, pos in enumerate(col_positions):
+            X[:, j] = df.iloc[:, pos].to_numpy()
         
-        # Predict
-        probs = self.model.predict_proba(X_scaled)[:, 1]
-        df['prob'] = probs
+        # Scale (same as scaler.transform, without the float64 copies)
+        np.subtract(X, self.scaler.mean_.astype(np.float32), out=X)
+        np.divide(X, self.scaler.scale_.astype(np.float32), out=X)
         
-        # Simulation Loop
-        position = 0 # 0: Flat, 1: Long
-        entry_price = 0.0
-        entry_time = None
-        cash = 10000.0 # Starting capital
-        holdings = 0.0
-        
-        trades = []
-        equity_curve = []
+        # Predict: sigmoid of the float32 linear score, same as the positive
+        # column of predict_proba for a binary LogisticRegression
+        if self.quantize:
+            if self.weights_q is None:
+                self.quantize_weights()
+            logits = self.quantized_logits(X)
+        else:
+            coef = self.model.coef_.ravel().astype(np.float32)
+            logits = X @ coef + np.float32(self.model.intercept_[0])
+        probs = 1.0 / (1.0 + np.exp(-logits.astype(np.float64)))
         
         # Strategy Parameters
         buy_threshold = 0.6
+        exit_threshold = 0.4 # Signal reversal
         stop_loss = 0.005 # 0.5%
         take_profit = 0.01 # 1.0%
         max_hold_time = pd.Timedelta(minutes=5)
         
-        for i, row in df.iterrows():
-            current_price = row['mid_price']
-            current_time = row['timestamp']
-            
-            # Mark to Market
-            current_equity = cash + (holdings * row['bid_px'] if holdings > 0 else 0)
-            equity_curve.append({'time': current_time, 'equity': current_equity})
-            
-            if position == 0:
-                if row['prob'] > buy_threshold:
-                    # BUY
-                    # Assume fill at Ask
-                    buy_price = row['ask_px']
-                    # Buy max possible
-                    size = (cash * 0.99) / buy_price # Leave buffer for fees
-                    cost = size * buy_price
-                    fee = cost * self.fee_rate
-                    
-                    cash -= (cost + fee)
-                    holdings = size
-                    position = 1
-                    entry_price = buy_price
-                    entry_time = current_time
-                    
-                    trades.append({
-                        'side': 'BUY',
-                        'price': buy_price,
-                        'size': size,
-                        'time': current_time,
-                        'fee': fee
-                    })
-            
-            elif position == 1:
-                # Check exit conditions
-                pct_change = (row['bid_px'] - entry_price) / entry_price
-                time_held = current_time - entry_time
-                
-                exit_signal = False
-                reason = ""
-                
-                if pct_change >= take_profit:
-                    exit_signal = True
-                    reason = "TP"
-                elif pct_change <= -stop_loss:
-                    exit_signal = True
-                    reason = "SL"
-                elif time_held >= max_hold_time:
-                    exit_signal = True
-                    reason = "Time"
-                elif row['prob'] < 0.4: # Signal reversal
-                    exit_signal = True
-                    reason = "Signal"
-                    
-                if exit_signal:
-                    # SELL
-                    sell_price = row['bid_px']
-                    revenue = holdings * sell_price
-                    fee = revenue * self.fee_rate
-                    
-                    cash += (revenue - fee)
-                    holdings = 0.0
-                    position = 0
-                    
-                    trades.append({
-                        'side': 'SELL',
-                        'price': sell_price,
-                        'size': holdings, # Note: this is 0 now, should log previous size
-                        'time': current_time,
-                        'fee': fee,
-                        'pnl': revenue - fee - (entry_price * size + (entry_price * size * self.fee_rate)), # Approx PnL
-                        'reason': reason
-                    })
-
-        # Final Close
-        if position == 1:
-            row = df.iloc[-1]
-            sell_price = row['bid_px']
-            revenue = holdings * sell_price
-            fee = revenue * self.fee_rate
-            cash += (revenue - fee)
-            trades.append({'side': 'SELL', 'price': sell_price, 'time': row['timestamp'], 'reason': 'End'})
-            
-        final_equity = cash
-        logger.info(f"Backtest Complete. Final Equity: {final_equity:.2f}")
-        logger.info(f"Total Trades: {len(trades)}")
+        # Simulation runs on plain arrays instead of per-row pandas access
+        times = df['timestamp'].to_numpy()
+        ts_ns = df['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        bid = df['bid_px'].to_numpy(dtype=np.float64)
+        ask = df['ask_px'].to_numpy(dtype=np.float64)
         
-        return pd.DataFrame(equity_curve), pd.DataFrame(trades)
-
+        (equity, final_equity, n_trades, trade_idx, trade_side, trade_price,
+         trade_size, trade_fee, trade_pnl, trade_reason) = _simulate(
+            probs, bid, ask, ts_ns,
+            INITIAL_CASH, buy_threshold, exit_threshold,
+            stop_loss, take_profit, max_hold_time.value, self.fee_rate
+        )
+        
+        equity_curve = pd.DataFrame({'time': times, 'equity': equity})
+        trades = pd.DataFrame({
+            'side': SIDE_LABELS[trade_side[:n_trades]],
+            'price': trade_price[:n_trades],
+            'size': trade_size[:n_trades],
+            'time': times[trade_idx[:n_trades]],
+            'fee': trade_fee[:n_trades],
+            'pnl': trade_pnl[:n_trades],
+            'reason': REASON_LABELS[trade_reason[:n_trades]],
+        })
+        
+        logger.info("Backtest Complete. Final Equity: %.2f", final_equity)
+        logger.info("Total Trades: %d", len(trades))
+        
+        return equity_curve, trades
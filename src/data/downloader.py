@@ -2,6 +2,7 @@ import os
 import lz4.frame
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Optional
@@ -13,9 +14,12 @@ logger = logging.getLogger(__name__)
 
 class HyperliquidDownloader:
     ARCHIVE_BUCKET = "hyperliquid-archive"
+    DEFAULT_WORKERS = 32
     
-    def __init__(self, raw_data_dir: str = "data/raw"):
-        self.s3 = get_s3_client(unsigned=True)
+    def __init__(self, raw_data_dir: str = "data/raw", max_workers: int = DEFAULT_WORKERS):
+        # One client shared by all workers; boto3 clients are thread-safe
+        self.max_workers = max_workers
+        self.s3 = get_s3_client(unsigned=True, max_pool_connections=max_workers)
         self.raw_data_dir = Path(raw_data_dir)
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -24,54 +28,59 @@ class HyperliquidDownloader:
         Downloads L2 orderbook data for a specific coin and date range.
         Path format: market_data/{YYYY-MM-DD}/{hour}/l2/{coin}.lz4
         """
-        logger.info(f"Starting L2 download for {coin} from {start_date.date()} to {end_date.date()}")
+        logger.info("Starting L2 download for %s from %s to %s", coin, start_date.date(), end_date.date())
         
+        dates = []
         current_date = start_date
         while current_date <= end_date:
-            # New format: market_data/YYYY-MM-DD/HH/l2/{COIN}.lz4
-            date_str = current_date.strftime("%Y-%m-%d")
-            date_compact = current_date.strftime("%Y%m%d") # For local storage
-            
-            # Iterate through 24 hours
-            for hour in range(24):
-                hour_str = f"{hour:02d}"
-                key = f"market_data/{date_str}/{hour_str}/l2/{coin}.lz4"
-                
-                output_dir = self.raw_data_dir / "l2Book" / date_compact / hour_str
-                output_dir.mkdir(parents=True, exist_ok=True)
-                output_file = output_dir / f"{coin}.json"
-                
-                if output_file.exists():
-                    logger.debug(f"Skipping existing file: {output_file}")
-                    continue
-
-                try:
-                    logger.debug(f"Downloading {key}...")
-                    # Direct GetObject, no listing
-                    response = self.s3.get_object(Bucket=self.ARCHIVE_BUCKET, Key=key)
-                    compressed_data = response['Body'].read()
-                    
-                    decompressed_data = lz4.frame.decompress(compressed_data)
-                    text_data = decompressed_data.decode('utf-8')
-                    
-                    with open(output_file, 'w') as f:
-                        f.write(text_data)
-                    
-                    logger.info(f"Downloaded {key}")
-                        
-                except self.s3.exceptions.ClientError as e:
-                    if e.response['Error']['Code'] == "404":
-                        logger.warning(f"File not found: {key}")
-                    elif e.response['Error']['Code'] == "403":
-                        logger.warning(f"Access Denied (Key might be wrong): {key}")
-                    else:
-                        logger.error(f"Error downloading {key}: {e}")
-                except Exception as e:
-                    logger.error(f"Error downloading {key}: {e}")
-            
+            dates.append(current_date)
             current_date += timedelta(days=1)
         
-        logger.info(f"Finished L2 download for {coin}")
+        # GetObject calls are I/O bound, so overlap them across threads
+        tasks = [(coin, date, hour) for date in dates for hour in range(24)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda task: self._download_hour(*task), tasks))
+        
+        logger.info("Finished L2 download for %s", coin)
+
+    def _download_hour(self, coin: str, date: datetime, hour: int):
+        # New format: market_data/YYYY-MM-DD/HH/l2/{COIN}.lz4
+        date_str = date.strftime("%Y-%m-%d")
+        date_compact = date.strftime("%Y%m%d") # For local storage
+        hour_str = f"{hour:02d}"
+        key = f"market_data/{date_str}/{hour_str}/l2/{coin}.lz4"
+        
+        output_dir = self.raw_data_dir / "l2Book" / date_compact / hour_str
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = output_dir / f"{coin}.json"
+        
+        if output_file.exists():
+            logger.debug("Skipping existing file: %s", output_file)
+            return
+
+        try:
+            logger.debug("Downloading %s...", key)
+            # Direct GetObject, no listing
+            response = self.s3.get_object(Bucket=self.ARCHIVE_BUCKET, Key=key)
+            compressed_data = response['Body'].read()
+            
+            decompressed_data = lz4.frame.decompress(compressed_data)
+            text_data = decompressed_data.decode('utf-8')
+            
+            with open(output_file, 'w') as f:
+                f.write(text_data)
+            
+            logger.info("Downloaded %s", key)
+                
+        except self.s3.exceptions.ClientError as e:
+            if e.response['Error']['Code'] == "404":
+                logger.warning("File not found: %s", key)
+            elif e.response['Error']['Code'] == "403":
+                logger.warning("Access Denied (Key might be wrong): %s", key)
+            else:
+                logger.error("Error downloading %s: %s", key, e)
+        except Exception as e:
+            logger.error("Error downloading %s: %s", key, e)
 
     def download_trades(self, coin: str, start_date: datetime, end_date: datetime):
         """
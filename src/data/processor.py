@@ -1,16 +1,84 @@
+import os
+import orjson
 import polars as pl
 from pathlib import Path
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from typing import Dict, List, Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Known L2 snapshot layout; passing it up front skips per-file schema inference.
+# Snapshots carry their epoch-ms time as either "time" or "timestamp"; a key
+# missing from a file just reads as null.
+L2_LEVEL = pl.Struct({"px": pl.String, "sz": pl.String, "n": pl.Int64})
+L2_SCHEMA = {
+    "coin": pl.String,
+    "time": pl.Int64,
+    "levels": pl.List(pl.List(L2_LEVEL)),
+    "timestamp": pl.Int64,
+}
+# Processed layout: px/sz parsed to floats once here instead of on every read
+L2_LEVEL_NUMERIC = pl.Struct({"px": pl.Float64, "sz": pl.Float64, "n": pl.Int64})
+L2_LEVELS_NUMERIC = pl.List(pl.List(L2_LEVEL_NUMERIC))
+
+# Best bid/ask columns pulled out of levels ([[bids], [asks]], best first)
+TOP_OF_BOOK_COLUMNS = ["bid_px", "bid_sz", "ask_px", "ask_sz"]
+
+
+def top_of_book_exprs(parse: bool = True) -> List[pl.Expr]:
+    """
+    Expressions extracting the best bid/ask price and size as floats
+    (TOP_OF_BOOK_COLUMNS), shared by the processor and FeatureCalculator.
+    
+    Each side's best level is looked up once and both fields are read from
+    it. parse=False skips the Float64 cast for levels already stored as
+    numbers.
+    """
+    exprs = []
+    for side, idx in (("bid", 0), ("ask", 1)):
+        best = pl.col("levels").list.get(idx).list.first().struct.field("px", "sz")
+        if parse:
+            best = best.cast(pl.Float64)
+        exprs.append(best.name.prefix(f"{side}_"))
+    return exprs
+
+
+def _is_json_array(json_file: Path) -> bool:
+    """True if the file holds a single JSON array rather than NDJSON lines."""
+    with open(json_file, "rb") as f:
+        return f.read(64).lstrip()[:1] == b"["
+
+
+def _read_json_array(json_file: Path) -> pl.DataFrame:
+    """
+    Parses a JSON-array L2 file with orjson against the fixed L2_SCHEMA.
+    Module-level so it can run in worker processes.
+    """
+    with open(json_file, "rb") as f:
+        rows = orjson.loads(f.read())
+    return pl.from_dicts(rows, schema=L2_SCHEMA)
+
+
 class DataProcessor:
-    def __init__(self, raw_dir: str = "data/raw", processed_dir: str = "data/processed"):
+    # Below this much JSON-array input, worker start-up costs more than it saves
+    MIN_PARALLEL_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, raw_dir: str = "data/raw", processed_dir: str = "data/processed",
+                 max_workers: Optional[int] = 1, top_of_book: bool = False):
         self.raw_dir = Path(raw_dir)
         self.processed_dir = Path(processed_dir)
         self.processed_dir.mkdir(parents=True, exist_ok=True)
+        # Worker processes for parsing JSON-array files (parsing holds the GIL).
+        # Opt-in: 1 parses in-process; None uses one worker per CPU. Spawned
+        # workers re-import the caller, so scripts need a __main__ guard.
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Store only timestamp, coin and best bid/ask instead of the full book
+        self.top_of_book = top_of_book
 
     def process_l2_day(self, coin: str, date: datetime):
         """
@@ -31,45 +99,97 @@ class DataProcessor:
             logger.warning(f"No JSON files found for {coin} on {date_str}")
             return
 
-        dfs = []
+        # JSON-array files need a full parse; NDJSON files are scanned lazily
+        array_files = [f for f in json_files if _is_json_array(f)]
+        parsed = self._read_json_arrays(array_files)
+
+        lfs = []
         for json_file in json_files:
-            try:
-                # L2 data is often a list of snapshots.
-                # We need to handle potential schema variations.
-                # Using polars lazy reading if possible, or eager for simplicity first.
-                # Assuming standard JSON structure.
-                
-                # If the file contains multiple JSON objects (one per line), use read_ndjson
-                # If it's a single JSON array, use read_json
-                # We'll try read_json first.
-                
-                # Note: Hyperliquid L2 updates might be complex. 
-                # Let's assume it's a list of book states.
-                df = pl.read_json(json_file)
-                dfs.append(df)
-            except Exception as e:
-                logger.error(f"Error reading {json_file}: {e}")
+            if json_file in parsed:
+                lfs.append(parsed[json_file].lazy())
+            elif json_file not in array_files:
+                lf = pl.scan_ndjson(json_file, schema=L2_SCHEMA)
+                try:
+                    # Cheap first-row check, so an unreadable hour is skipped
+                    # like a bad JSON array instead of failing the whole sink
+                    lf.head(1).collect()
+                except Exception as e:
+                    logger.error(f"Error reading {json_file}: {e}")
+                    continue
+                lfs.append(lf)
 
-        if not dfs:
+        if not lfs:
             return
 
-        full_df = pl.concat(dfs)
+        # Lazy concat so Polars can fuse read -> concat -> cast -> write
+        full_lf = pl.concat(lfs, how="diagonal_relaxed")
         
         # Standardization
-        # Ensure timestamp is datetime
-        if "time" in full_df.columns:
-            full_df = full_df.with_columns(
-                pl.col("time").cast(pl.Int64).cast(pl.Datetime("ms")).alias("timestamp")
-            )
-        elif "timestamp" in full_df.columns:
-             full_df = full_df.with_columns(
-                pl.col("timestamp").cast(pl.Int64).cast(pl.Datetime("ms"))
-            )
+        # Ensure timestamp is datetime, whichever of the two keys a file used
+        full_lf = full_lf.with_columns(
+            pl.coalesce("time", "timestamp").alias("time")
+        ).with_columns(
+            pl.col("time").cast(pl.Datetime("ms")).alias("timestamp")
+        )
+        
+        # Parse the price/size strings in one pass so readers get numeric levels
+        full_lf = full_lf.with_columns(pl.col("levels").cast(L2_LEVELS_NUMERIC))
+        
+        if self.top_of_book:
+            # Projected inside the lazy plan, so the nested levels never reach disk
+            full_lf = full_lf.select(["timestamp", "coin", *top_of_book_exprs(parse=False)])
             
-        # Save to Parquet
+        # Save to Parquet (streamed, never holding the whole day in memory)
         output_dir = self.processed_dir / "l2Book" / date_str
         output_dir.mkdir(parents=True, exist_ok=True)
         output_file = output_dir / f"{coin}.parquet"
         
-        full_df.write_parquet(output_file)
+        full_lf.sink_parquet(
+            output_file,
+            compression="zstd",
+            compression_level=3,
+            row_group_size=1_000_000,
+            statistics=True,
+        )
         logger.info(f"Saved processed data to {output_file}")
+
+    def _read_json_arrays(self, json_files: List[Path]) -> Dict[Path, pl.DataFrame]:
+        """
+        Parses JSON-array files, in parallel worker processes when enabled and
+        the input is large enough. Files that fail to parse are logged and
+        left out.
+        """
+        if (self.max_workers <= 1 or len(json_files) < 2
+                or sum(f.stat().st_size for f in json_files) < self.MIN_PARALLEL_BYTES):
+            return self._read_json_arrays_serial(json_files)
+
+        # Spawn rather than fork: forking after Polars has started its thread pool can deadlock
+        workers = min(self.max_workers, len(json_files))
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+            futures = {f: executor.submit(_read_json_array, f) for f in json_files}
+
+        results = {}
+        broken = []
+        for json_file, future in futures.items():
+            try:
+                results[json_file] = future.result()
+            except BrokenProcessPool:
+                broken.append(json_file)
+            except Exception as e:
+                logger.error(f"Error reading {json_file}: {e}")
+        
+        if broken:
+            # Workers died (e.g. a caller without a __main__ guard); parse here instead
+            logger.warning(f"Worker pool failed, parsing {len(broken)} files in-process")
+            results.update(self._read_json_arrays_serial(broken))
+        return results
+
+    def _read_json_arrays_serial(self, json_files: List[Path]) -> Dict[Path, pl.DataFrame]:
+        results = {}
+        for json_file in json_files:
+            try:
+                results[json_file] = _read_json_array(json_file)
+            except Exception as e:
+                logger.error(f"Error reading {json_file}: {e}")
+        return results
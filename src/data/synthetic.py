@@ -1,19 +1,27 @@
-import json
-import random
+import orjson
+import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 class SyntheticDataGenerator:
-    def __init__(self, raw_dir: str = "data/raw"):
+    SNAPSHOTS_PER_HOUR = 60 # 1 per minute
+    NUM_LEVELS = 10
+    
+    def __init__(self, raw_dir: str = "data/raw", seed: Optional[int] = None):
         self.raw_dir = Path(raw_dir)
+        self.rng = np.random.default_rng(seed)
     
     def generate_l2_data(self, coin: str, date: datetime, num_hours: int = 1):
         """Generates synthetic L2 orderbook data."""
         date_str = date.strftime("%Y%m%d")
         
+        # Level k sits (k + 1) * 5 bps away from the mid on either side
+        offsets = np.arange(1, self.NUM_LEVELS + 1) * 0.0005
+        
         for hour in range(num_hours):
             hour_str = f"{hour:02d}"
             output_dir = self.raw_dir / "l2Book" / date_str / hour_str
@@ -22,34 +30,33 @@ class SyntheticDataGenerator:
             
             logger.info(f"Generating synthetic data for {coin} at {date_str} {hour_str}:00")
             
-            # Generate 60 snapshots (1 per minute)
-            snapshots = []
+            # Generate 60 snapshots (1 per minute), all at once
+            n = self.SNAPSHOTS_PER_HOUR
+            start_ms = int((date + timedelta(hours=hour)).timestamp() * 1000)
+            timestamps = range(start_ms, start_ms + n * 60_000, 60_000)
             base_price = 100.0 if coin == "SOL" else 50000.0
             
-            for i in range(60):
-                timestamp = int((date + timedelta(hours=hour, minutes=i)).timestamp() * 1000)
-                
-                # Random walk price
-                base_price *= (1 + random.uniform(-0.001, 0.001))
-                
-                # Generate bids and asks
-                bids = []
-                asks = []
-                for level in range(10):
-                    bid_px = base_price * (1 - (level + 1) * 0.0005)
-                    ask_px = base_price * (1 + (level + 1) * 0.0005)
-                    qty = random.uniform(1, 100)
-                    bids.append({"px": f"{bid_px:.2f}", "sz": f"{qty:.2f}", "n": 1})
-                    asks.append({"px": f"{ask_px:.2f}", "sz": f"{qty:.2f}", "n": 1})
-                
-                snapshot = {
+            # Random walk price
+            prices = base_price * np.cumprod(1 + self.rng.uniform(-0.001, 0.001, n))
+            
+            # Generate bids and asks (same size on both sides of a level)
+            bid_px = (prices[:, None] * (1 - offsets)).tolist()
+            ask_px = (prices[:, None] * (1 + offsets)).tolist()
+            qty = self.rng.uniform(1, 100, (n, self.NUM_LEVELS)).tolist()
+            
+            snapshots = []
+            for timestamp, bids_row, asks_row, qty_row in zip(timestamps, bid_px, ask_px, qty):
+                sizes = [f"{q:.2f}" for q in qty_row]
+                snapshots.append({
                     "coin": coin,
                     "time": timestamp,
-                    "levels": [bids, asks]
-                }
-                snapshots.append(snapshot)
+                    "levels": [
+                        [{"px": f"{px:.2f}", "sz": sz, "n": 1} for px, sz in zip(bids_row, sizes)],
+                        [{"px": f"{px:.2f}", "sz": sz, "n": 1} for px, sz in zip(asks_row, sizes)],
+                    ]
+                })
             
-            with open(output_file, 'w') as f:
-                json.dump(snapshots, f)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(snapshots))
                 
         logger.info(f"Synthetic data generation complete for {coin}")
@@ -1,31 +1,141 @@
 import polars as pl
 import numpy as np
 from pathlib import Path
+from typing import List, Union
 import logging
+from src.utils.jit import njit
+from src.data.processor import top_of_book_exprs
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ROLLING_DTYPE = pl.Struct({"returns": pl.Float64, "volatility_5m": pl.Float64})
+
+# Rows per Parquet row group in saved feature files
+FEATURE_ROW_GROUP_SIZE = 128_000
+
+
+@njit(cache=True, nogil=True)
+def _returns_and_rolling_std(mid, window, min_periods):
+    """
+    Simple returns of mid and their rolling sample std over the last
+    `window` rows, in one O(N) pass.
+    
+    Matches pct_change + rolling_std: a missing return (the first row) still
+    occupies a window slot, the std needs at least `min_periods` (and 2)
+    returns in the window, and missing outputs are NaN.
+    """
+    n = len(mid)
+    returns = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    
+    # Running count/mean/M2 of the non-NaN returns in the window (Welford,
+    # with the matching removal step for the value leaving the window)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    
+    for i in range(n):
+        if i > 0:
+            returns[i] = mid[i] / mid[i - 1] - 1.0
+        
+        x = returns[i]
+        if not np.isnan(x):
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+        
+        if i >= window:
+            y = returns[i - window]
+            if not np.isnan(y):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = y - mean
+                    mean -= delta / count
+                    m2 -= delta * (y - mean)
+        
+        if count >= min_periods and count >= 2:
+            std[i] = np.sqrt(max(m2, 0.0) / (count - 1))
+    
+    return returns, std
+
+
+def _rolling_returns(mid: pl.Series, window: int, min_periods: int) -> pl.Series:
+    """Runs _returns_and_rolling_std on a mid_price column, as a struct Series."""
+    returns, std = _returns_and_rolling_std(
+        mid.to_numpy().astype(np.float64, copy=False), window, min_periods
+    )
+    return pl.DataFrame([
+        pl.Series("returns", returns, nan_to_null=True),
+        pl.Series("volatility_5m", std, nan_to_null=True),
+    ]).to_struct("rolling")
+
+
+def _levels_are_strings(levels_dtype: pl.DataType) -> bool:
+    """True if the book levels still hold px/sz as unparsed strings."""
+    fields = {f.name: f.dtype for f in levels_dtype.inner.inner.fields}
+    return fields.get("px") == pl.String
+
+
+def _as_float(expr: pl.Expr, parse: bool) -> pl.Expr:
+    """Casts px/sz to Float64 only when they still need parsing."""
+    return expr.cast(pl.Float64) if parse else expr
+
 class FeatureCalculator:
-    def __init__(self, processed_dir: str = "data/processed", features_dir: str = "data/features"):
+    def __init__(self, processed_dir: str = "data/processed", features_dir: str = "data/features",
+                 depth_levels: int = 0):
         self.processed_dir = Path(processed_dir)
         self.features_dir = Path(features_dir)
         self.features_dir.mkdir(parents=True, exist_ok=True)
+        # Number of book levels per side in the depth features (0: disabled)
+        self.depth_levels = depth_levels
+
+    def depth_columns(self) -> List[str]:
+        """Names of the depth features added when depth_levels is set."""
+        return [
+            f"{side}_depth_{i}"
+            for side in ("bid", "ask")
+            for i in range(1, self.depth_levels + 1)
+        ]
 
-    def load_data(self, coin: str, date_str: str) -> pl.DataFrame:
-        """Loads processed Parquet data for a specific coin and date."""
+    def load_data(self, coin: str, date_str: str) -> pl.LazyFrame:
+        """
+        Lazily scans processed Parquet data for a specific coin and date.
+        Only the columns compute_features uses are read from disk.
+        """
         file_path = self.processed_dir / "l2Book" / date_str / f"{coin}.parquet"
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-        return pl.read_parquet(file_path)
+        return pl.scan_parquet(file_path)
 
-    def compute_features(self, df: pl.DataFrame, inference: bool = False) -> pl.DataFrame:
+    def compute_features(self, df: Union[pl.DataFrame, pl.LazyFrame], inference: bool = False) -> pl.DataFrame:
         """
         Computes features from L2 orderbook data.
         Assumes 'levels' column structure: [[bids], [asks]]
         where bids/asks are lists of structs {px: str, sz: str, n: int}
         """
         logger.info("Computing features...")
+        return self.feature_plan(df, inference).collect(engine="streaming")
+
+    def compute_features_many(self, files: List[Path], inference: bool = False) -> pl.DataFrame:
+        """
+        Computes features for several processed Parquet files (e.g. one per
+        coin/day) in a single query.
+        
+        Rolling windows and targets stay within each file; Polars runs the
+        per-file plans concurrently and concatenates the results in order.
+        """
+        logger.info("Computing features for %d files...", len(files))
+        plans = [self.feature_plan(pl.scan_parquet(f), inference) for f in files]
+        return pl.concat(plans, how="vertical").collect(engine="streaming")
+
+    def feature_plan(self, df: Union[pl.DataFrame, pl.LazyFrame], inference: bool = False) -> pl.LazyFrame:
+        """Builds the lazy feature query for compute_features without collecting it."""
+        df = df.lazy()
         
         # 1. Extract Best Bid/Ask and Sizes
         # levels[0] is bids, levels[1] is asks.
@@ -34,60 +144,75 @@ class FeatureCalculator:
         # Hyperliquid snapshots usually order Bids DESC, Asks ASC.
         
         # Helper expression to get first element of the list (best price)
-        # We need to cast String to Float
+        # Raw books carry px/sz as strings; processed files store them as floats
         
-        df = df.with_columns([
-            pl.col("levels").list.get(0).alias("bids"),
-            pl.col("levels").list.get(1).alias("asks")
-        ])
-
-        # Extract Best Bid/Ask Price and Size
-        # bids[0] -> {px, sz, n}
-        df = df.with_columns([
-            pl.col("bids").list.get(0).struct.field("px").cast(pl.Float64).alias("bid_px"),
-            pl.col("bids").list.get(0).struct.field("sz").cast(pl.Float64).alias("bid_sz"),
-            pl.col("asks").list.get(0).struct.field("px").cast(pl.Float64).alias("ask_px"),
-            pl.col("asks").list.get(0).struct.field("sz").cast(pl.Float64).alias("ask_sz"),
-        ])
+        # Top-of-book processed files already carry bid_px/bid_sz/ask_px/ask_sz
+        schema = df.collect_schema()
+        if "levels" in schema.names():
+            # Extract Best Bid/Ask Price and Size
+            # levels[side][0] -> {px, sz, n}, same expressions the processor
+            # uses for its top-of-book layout
+            string_levels = _levels_are_strings(schema["levels"])
+            df = df.with_columns(top_of_book_exprs(parse=string_levels))
         
-        # 2. Basic Price Features
+        # 2. Basic Price Features and 3. Weighted Mid Price
+        # All read only the top-of-book columns, so they share one pass; the
+        # shared size total is a single expression Polars evaluates once
+        top_sz = pl.col("bid_sz") + pl.col("ask_sz")
         df = df.with_columns([
             ((pl.col("bid_px") + pl.col("ask_px")) / 2).alias("mid_price"),
             (pl.col("ask_px") - pl.col("bid_px")).alias("spread"),
-            ((pl.col("bid_sz") - pl.col("ask_sz")) / (pl.col("bid_sz") + pl.col("ask_sz"))).alias("imbalance_1")
-        ])
-        
-        # 3. Weighted Mid Price
-        df = df.with_columns([
+            ((pl.col("bid_sz") - pl.col("ask_sz")) / top_sz).alias("imbalance_1"),
             (
                 (pl.col("bid_px") * pl.col("ask_sz") + pl.col("ask_px") * pl.col("bid_sz")) / 
-                (pl.col("bid_sz") + pl.col("ask_sz"))
+                top_sz
             ).alias("wmp")
         ])
 
+        # 3b. Depth Distribution
+        # Share of the visible volume resting at each of the first L levels,
+        # P_B,i = bid_sz_i / V and P_A,i = ask_sz_i / V, with V the total size
+        # over those levels on both sides. Missing levels count as 0.
+        if self.depth_levels:
+            if "levels" not in df.collect_schema().names():
+                raise ValueError("Depth features need the full 'levels' book")
+            L = self.depth_levels
+            # Trim to the first L levels before parsing, so the per-element
+            # eval never touches deeper levels that are discarded anyway
+            df = df.with_columns([
+                pl.col("levels").list.get(side).list.head(L)
+                .list.eval(_as_float(pl.element().struct.field("sz"), string_levels))
+                .alias(f"_{prefix}_sizes")
+                for side, prefix in ((0, "bid"), (1, "ask"))
+            ])
+            total = pl.col("_bid_sizes").list.sum() + pl.col("_ask_sizes").list.sum()
+            df = df.with_columns([
+                (pl.col(f"_{prefix}_sizes").list.get(i, null_on_oob=True).fill_null(0.0) / total)
+                .alias(f"{prefix}_depth_{i + 1}")
+                for prefix in ("bid", "ask")
+                for i in range(L)
+            ]).drop("_bid_sizes", "_ask_sizes")
+
         # 4. Time-based Features (Rolling)
         # Sort by time just in case
         df = df.sort("timestamp")
         
-        # Returns
-        df = df.with_columns([
-            pl.col("mid_price").pct_change().alias("returns")
-        ])
-        
-        # Rolling Volatility (e.g., 5-minute window)
+        # Returns and Rolling Volatility (e.g., 5-minute window)
         # Assuming 1-minute snapshots for synthetic data, but real data might be irregular.
         # We'll use row-based rolling for simplicity or time_based if needed.
-        # Let's use a simple rolling_std over last 5 rows for now.
+        # Let's use a simple rolling std over last 5 rows for now.
+        # For inference, we might not have enough history in the batch.
+        # We assume the caller handles history or we accept null/0.
+        window = 5
+        min_periods = 1 if inference else window
+        df = df.with_columns([
+            pl.col("mid_price").map_batches(
+                lambda mid: _rolling_returns(mid, window, min_periods),
+                return_dtype=ROLLING_DTYPE,
+            ).alias("rolling")
+        ]).unnest("rolling")
         if inference:
-             # For inference, we might not have enough history in the batch.
-             # We assume the caller handles history or we accept null/0.
-             df = df.with_columns([
-                pl.col("returns").rolling_std(window_size=5, min_periods=1).fill_null(0).alias("volatility_5m")
-            ])
-        else:
-            df = df.with_columns([
-                pl.col("returns").rolling_std(window_size=5).alias("volatility_5m")
-            ])
+            df = df.with_columns([pl.col("volatility_5m").fill_null(0)])
         
         # 5. Target Generation
         if not inference:
@@ -105,8 +230,11 @@ class FeatureCalculator:
                 (pl.col("future_return_5m") > 0.001).cast(pl.Int32).alias("target")
             ])
             
-            # Drop rows with nulls (due to rolling/shifting)
-            df = df.drop_nulls()
+            # Drop rows with nulls (due to rolling/shifting). Checking only the
+            # derived columns is enough: volatility needs the last window of mid
+            # prices, the target needs the current and future mid, and the
+            # imbalance needs both sizes, so every null input shows up here.
+            df = df.drop_nulls(subset=["volatility_5m", "imbalance_1", "target"])
         else:
             # For inference, we don't need target, but we might need to fill nulls for features
             df = df.fill_null(0)
@@ -118,6 +246,7 @@ class FeatureCalculator:
             "mid_price", "spread", "imbalance_1", "wmp",
             "volatility_5m"
         ]
+        select_cols.extend(self.depth_columns())
         
         if not inference:
             select_cols.append("target")
@@ -126,10 +255,21 @@ class FeatureCalculator:
         
         return df
 
-    def save_features(self, df: pl.DataFrame, coin: str, date_str: str):
+    def save_features(self, df: Union[pl.DataFrame, pl.LazyFrame], coin: str, date_str: str):
         output_dir = self.features_dir / date_str
         output_dir.mkdir(parents=True, exist_ok=True)
         output_file = output_dir / f"{coin}_features.parquet"
-        df.write_parquet(output_file)
-        logger.info(f"Saved features to {output_file}")
+        # zstd with per-row-group statistics, so scans filtering on time can
+        # skip row groups instead of reading the whole file
+        options = dict(
+            compression="zstd",
+            compression_level=3,
+            row_group_size=FEATURE_ROW_GROUP_SIZE,
+            statistics=True,
+        )
+        if isinstance(df, pl.LazyFrame):
+            df.sink_parquet(output_file, **options)
+        else:
+            df.write_parquet(output_file, **options)
+        logger.info("Saved features to %s", output_file)
 
@@ -1,10 +1,9 @@
-import json
-import websocket
-import threading
-import time
+import asyncio
+import orjson
+import websockets
+from websockets.asyncio.client import connect
 import logging
-from collections import deque
-from typing import Optional, Dict, List
+from typing import Optional, Dict
 
 logger = logging.getLogger(__name__)
 
@@ -14,65 +13,71 @@ class HyperliquidConnector:
     def __init__(self, coin: str = "SOL"):
         self.coin = coin
         self.ws = None
+        # Single-slot handoff to the engine: both run on the same event loop,
+        # and the engine only ever needs the newest book
         self.latest_book: Optional[Dict] = None
-        self.lock = threading.Lock()
         self.running = False
-        self.thread = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+        # Subscription frame, serialized once
+        self._sub_bytes = orjson.dumps({
+            "method": "subscribe",
+            "subscription": {
+                "type": "l2Book",
+                "coin": self.coin
+            }
+        })
 
-    def on_message(self, ws, message):
+    def on_message(self, message):
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             channel = data.get("channel")
             
             if channel == "l2Book":
                 # Data format: {channel: 'l2Book', data: {coin: 'SOL', time: 123, levels: [[...], [...]]}}
                 content = data.get("data", {})
                 if content.get("coin") == self.coin:
-                    with self.lock:
-                        self.latest_book = content
+                    self.latest_book = content
         except Exception as e:
-            logger.error(f"WS Error: {e}")
-
-    def on_error(self, ws, error):
-        logger.error(f"WS Error: {error}")
-
-    def on_close(self, ws, close_status_code, close_msg):
-        logger.info("WS Connection Closed")
+            logger.error("WS Error: %s", e)
 
-    def on_open(self, ws):
-        logger.info("WS Connection Opened")
-        # Subscribe
-        msg = {
-            "method": "subscribe",
-            "subscription": {
-                "type": "l2Book",
-                "coin": self.coin
-            }
-        }
-        ws.send(json.dumps(msg))
+    async def listen(self):
+        """Subscribes and stores each incoming book until stopped or disconnected."""
+        try:
+            async with connect(self.WS_URL) as ws:
+                self.ws = ws
+                logger.info("WS Connection Opened")
+                # Subscribe (sent as a text frame, like the JSON it is)
+                await ws.send(self._sub_bytes, text=True)
+                
+                while self.running:
+                    # Raw bytes: orjson rejects invalid UTF-8 itself, so skip
+                    # the client's own decode pass
+                    self.on_message(await ws.recv(decode=False))
+        except websockets.ConnectionClosed:
+            pass
+        except (OSError, websockets.WebSocketException) as e:
+            logger.error("WS Error: %s", e)
+        finally:
+            self.running = False
+            self.ws = None
+            logger.info("WS Connection Closed")
 
     def start(self):
+        """Starts listening on the running event loop; call from a coroutine."""
         self.running = True
-        # websocket.enableTrace(True)
-        self.ws = websocket.WebSocketApp(
-            self.WS_URL,
-            on_open=self.on_open,
-            on_message=self.on_message,
-            on_error=self.on_error,
-            on_close=self.on_close
-        )
-        
-        self.thread = threading.Thread(target=self.ws.run_forever)
-        self.thread.daemon = True
-        self.thread.start()
+        self.loop = asyncio.get_running_loop()
+        self.task = self.loop.create_task(self.listen())
 
     def stop(self):
+        """Stops the listener. Safe to call from any thread."""
         self.running = False
-        if self.ws:
-            self.ws.close()
-        if self.thread:
-            self.thread.join(timeout=1)
+        if self.task and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.task.cancel)
+
+    async def wait_closed(self):
+        if self.task:
+            await asyncio.gather(self.task, return_exceptions=True)
 
     def get_latest_book(self):
-        with self.lock:
-            return self.latest_book
+        return self.latest_book
@@ -1,138 +1,214 @@
+import asyncio
+import math
 import time
 import logging
-import pandas as pd
-import polars as pl
+from collections import deque
+import numpy as np
 import joblib
 from pathlib import Path
 from src.live.connector import HyperliquidConnector
-from src.features.calculator import FeatureCalculator
+from src.utils.artifacts import latest_artifact
+
+try:
+    import uvloop # Faster event loop, optional (Linux/macOS)
+except ImportError:
+    uvloop = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model inputs, in the column order the scaler and model were trained on
+FEATURE_COLUMNS = [
+    "bid_px", "ask_px", "bid_sz", "ask_sz",
+    "mid_price", "spread", "imbalance_1", "wmp",
+    "volatility_5m",
+]
+MID_PRICE_IDX = FEATURE_COLUMNS.index("mid_price")
+
 class LiveEngine:
-    def __init__(self, coin: str = "SOL", models_dir: str = "models"):
+    VOL_WINDOW = 5 # Returns in the rolling volatility window
+
+    def __init__(self, coin: str = "SOL", models_dir: str = "models",
+                 batch_size: int = 1, poll_interval: float = 1.0, max_delay: float = 1.0):
         self.coin = coin
+        # Ticks are scored in batches of up to batch_size rows, flushed at the
+        # latest max_delay seconds after the first buffered tick
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_delay = max_delay
         self.connector = HyperliquidConnector(coin)
-        self.feature_calc = FeatureCalculator() # We'll reuse methods if possible
         self.models_dir = Path(models_dir)
         self.model = None
         self.scaler = None
+        self.weights = None
+        self.bias = 0.0
+        
+        # Recent tick returns for the rolling volatility feature
+        self.returns = deque(maxlen=self.VOL_WINDOW)
+        self.last_mid = None
         
         self.load_model()
 
     def load_model(self):
-        model_files = sorted(list(self.models_dir.glob("lr_model_*.pkl")))
-        scaler_files = sorted(list(self.models_dir.glob("scaler_*.pkl")))
+        model_file = latest_artifact(self.models_dir, "lr_model_")
+        scaler_file = latest_artifact(self.models_dir, "scaler_")
         
-        if not model_files or not scaler_files:
+        if model_file is None or scaler_file is None:
             raise FileNotFoundError("No model or scaler found.")
             
-        self.model = joblib.load(model_files[-1])
-        self.scaler = joblib.load(scaler_files[-1])
-        logger.info(f"Loaded model: {model_files[-1].name}")
+        # Memory-map the stored arrays read-only (shared page cache across engines)
+        self.model = joblib.load(model_file.path, mmap_mode='r')
+        self.scaler = joblib.load(scaler_file.path, mmap_mode='r')
+        logger.info("Loaded model: %s", model_file.name)
+        
+        # Fold the scaler into the model: w.x + b == coef.((x - mean) / scale) + intercept
+        # (computed into fresh in-memory arrays, so scoring never touches the mapping)
+        coef = self.model.coef_[0]
+        self.weights = np.array(coef / self.scaler.scale_, dtype=np.float64)
+        self.bias = float(self.model.intercept_[0] - (self.scaler.mean_ / self.scaler.scale_) @ coef)
+
+    def predict_proba(self, features: np.ndarray) -> float:
+        """Probability of the positive class for one feature row."""
+        z = float(self.weights @ features) + self.bias
+        # Numerically stable sigmoid
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
+
+    def predict_proba_batch(self, features: np.ndarray) -> np.ndarray:
+        """Probabilities of the positive class for a (n, n_features) block."""
+        z = features @ self.weights + self.bias
+        # Numerically stable sigmoid: 1 / (1 + e^-z) == exp(-log(1 + e^-z))
+        return np.exp(-np.logaddexp(0.0, -z))
+
+    def emit_signals(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Scores a block of feature rows at once and logs a signal per row.
+        
+        Returns the probabilities, whether or not INFO logging is enabled.
+        """
+        probs = self.predict_proba_batch(batch)
+        # Only the per-row log lines depend on the logging level
+        if not logger.isEnabledFor(logging.INFO):
+            return probs
+        for features, prob in zip(batch, probs):
+            # Signal
+            signal = "HOLD"
+            if prob > 0.6:
+                signal = "BUY"
+            elif prob < 0.4:
+                signal = "SELL"
+                
+            logger.info("Price: %.2f | Prob: %.4f | Signal: %s", features[MID_PRICE_IDX], prob, signal)
+        return probs
 
     def process_snapshot(self, book_data):
+        """
+        Computes the model features for one book snapshot directly from its
+        best bid/ask, in FEATURE_COLUMNS order.
+        
+        Returns a float64 array, or None if the snapshot has no usable levels
+        (missing sides, or zero size at the top of both).
+        """
         # Debug logging
         # logger.info(f"Book Data Keys: {book_data.keys()}")
         levels = book_data.get("levels")
-        if not levels or len(levels) < 2:
+        if not levels or len(levels) < 2 or not levels[0] or not levels[1]:
             logger.warning("Invalid levels data")
             return None
-            
-        # Convert single snapshot to DataFrame format expected by FeatureCalculator
-        # FeatureCalculator expects Polars DataFrame with 'levels'
         
-        # Construct Polars DataFrame
-        # book_data['levels'] is [[bids], [asks]]
-        # We need to wrap it in a list to make it a single row
+        # book_data['levels'] is [[bids], [asks]], best level first
+        best_bid, best_ask = levels[0][0], levels[1][0]
+        bid_px, bid_sz = float(best_bid["px"]), float(best_bid["sz"])
+        ask_px, ask_sz = float(best_ask["px"]), float(best_ask["sz"])
         
-        row = {
-            "coin": self.coin,
-            "time": book_data.get("time"),
-            "levels": levels, # Do not wrap in list for Polars
-            "timestamp": book_data.get("time") # Placeholder, will be cast
-        }
-        
-        df = pl.DataFrame([row])
-        
-        # Cast timestamp
-        df = df.with_columns(
-            pl.col("timestamp").cast(pl.Int64).cast(pl.Datetime("ms"))
-        )
-        
-        # logger.info(f"Schema: {df.schema}")
-        # logger.info(f"Row: {df.head(1)}")
-        
-        # Compute features
-        # Note: FeatureCalculator.compute_features expects a batch and does rolling windows.
-        # For live inference, we have two options:
-        # 1. Maintain a buffer of recent snapshots to compute rolling features.
-        # 2. Use simplified features for MVP (no rolling).
-        
-        # The current FeatureCalculator uses:
-        # - mid_price, spread, imbalance_1, wmp (Instantaneous)
-        # - volatility_5m (Rolling)
-        # - target (Future - not needed for inference)
-        
-        # We need to handle volatility. If we don't have history, it will be null.
-        # For MVP, let's assume 0 volatility or handle it.
-        # Ideally, we keep a buffer.
+        # Same definitions as FeatureCalculator.compute_features
+        mid_price = (bid_px + ask_px) / 2
+        spread = ask_px - bid_px
+        total_sz = bid_sz + ask_sz
+        if total_sz == 0:
+            # Imbalance and wmp are undefined; skip the tick rather than crash run()
+            logger.warning("Empty top of book")
+            return None
+        imbalance_1 = (bid_sz - ask_sz) / total_sz
+        wmp = (bid_px * ask_sz + ask_px * bid_sz) / total_sz
         
-        features_df = self.feature_calc.compute_features(df, inference=True)
+        # Rolling volatility over the last VOL_WINDOW tick returns; like the
+        # calculator's inference mode it is 0 until two returns are available
+        if self.last_mid is not None:
+            self.returns.append(mid_price / self.last_mid - 1.0)
+        self.last_mid = mid_price
         
-        # Handle missing rolling features
-        features_df = features_df.fill_null(0)
+        n = len(self.returns)
+        if n >= 2:
+            mean = sum(self.returns) / n
+            volatility_5m = math.sqrt(sum((r - mean) ** 2 for r in self.returns) / (n - 1))
+        else:
+            volatility_5m = 0.0
         
-        return features_df
+        return np.array([
+            bid_px, ask_px, bid_sz, ask_sz,
+            mid_price, spread, imbalance_1, wmp,
+            volatility_5m,
+        ])
 
-    def run(self):
+    async def run(self):
+        """Scores incoming books until the connector stops; shares its event loop."""
         logger.info("Starting Live Engine...")
         self.connector.start()
         
+        # Preallocated batch buffer; rows [0, pending) are waiting to be scored
+        batch = np.empty((self.batch_size, len(FEATURE_COLUMNS)))
+        pending = 0
+        deadline = 0.0
+        # Last book turned into features; the connector replaces the object on
+        # every message, so an identical one means nothing new arrived
+        last_book = None
+        
         try:
-            while True:
+            while self.connector.running:
                 book = self.connector.get_latest_book()
-                if book:
-                    # Process
-                    features_df = self.process_snapshot(book)
-                    
-                    # Prepare for model
-                    # Convert to pandas
-                    pdf = features_df.to_pandas()
-                    
-                    # Select features
-                    drop_cols = ["timestamp", "coin", "target"]
-                    feature_cols = [c for c in pdf.columns if c not in drop_cols]
-                    
-                    # Ensure columns match model expectation (might need to check scaler)
-                    # For now assume they match if code hasn't changed.
-                    
-                    X = pdf[feature_cols]
-                    X_scaled = self.scaler.transform(X)
-                    
-                    # Predict
-                    prob = self.model.predict_proba(X_scaled)[0, 1]
-                    
-                    # Signal
-                    signal = "HOLD"
-                    if prob > 0.6:
-                        signal = "BUY"
-                    elif prob < 0.4:
-                        signal = "SELL"
-                        
-                    logger.info(f"Price: {pdf['mid_price'].iloc[0]:.2f} | Prob: {prob:.4f} | Signal: {signal}")
-                    
-                else:
+                if not book:
                     logger.info("Waiting for data...")
+                elif book is not last_book:
+                    # Each book is used once: re-polling an unchanged book
+                    # would add a zero return to the volatility window
+                    last_book = book
+                    features = self.process_snapshot(book)
+                    if features is not None:
+                        if pending == 0:
+                            deadline = time.monotonic() + self.max_delay
+                        batch[pending] = features
+                        pending += 1
+                
+                # Predict
+                if pending and (pending == self.batch_size or time.monotonic() >= deadline):
+                    self.emit_signals(batch[:pending])
+                    pending = 0
                 
-                time.sleep(1) # 1Hz update
+                await asyncio.sleep(self.poll_interval) # 1Hz update by default
                 
-        except KeyboardInterrupt:
+        except asyncio.CancelledError:
             logger.info("Stopping...")
+            raise
         finally:
+            # Score whatever is still buffered before shutting down
+            if pending:
+                self.emit_signals(batch[:pending])
             self.connector.stop()
+            await self.connector.wait_closed()
+
+
+def run_event_loop(main):
+    """Runs a coroutine on uvloop when it is installed, else the stock asyncio loop."""
+    if uvloop is None:
+        return asyncio.run(main)
+    return uvloop.run(main)
 
 if __name__ == "__main__":
     engine = LiveEngine()
-    engine.run()
+    try:
+        run_event_loop(engine.run())
+    except KeyboardInterrupt:
+        pass
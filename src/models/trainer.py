@@ -1,11 +1,11 @@
 import polars as pl
-import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, classification_report
 from sklearn.model_selection import TimeSeriesSplit, GridSearchCV
 import joblib
+from datetime import datetime
 from pathlib import Path
 import logging
 import json
@@ -14,60 +14,81 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ModelTrainer:
-    def __init__(self, features_dir: str = "data/features", models_dir: str = "models"):
+    def __init__(self, features_dir: str = "data/features", models_dir: str = "models",
+                 solver: str = "liblinear", n_jobs: int = -1):
         self.features_dir = Path(features_dir)
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
         self.scaler = StandardScaler()
         self.model = None
+        # 'saga' scales better on large datasets and fits float32 directly;
+        # liblinear always works on a float64 copy
+        self.solver = solver
+        # Grid-search fits run in parallel (-1: all cores)
+        self.n_jobs = n_jobs
 
-    def load_dataset(self, coin: str, date_str: str) -> pd.DataFrame:
-        """Loads feature dataset."""
-        # In a real scenario, we might load multiple days.
-        # For now, load one file.
-        file_path = self.features_dir / date_str / f"{coin}_features.parquet"
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        # Convert to pandas for sklearn compatibility
-        df = pl.read_parquet(file_path).to_pandas()
-        
-        # Sort by time to ensure chronological order
-        df = df.sort_values("timestamp")
-        return df
+    def load_dataset(self, coin: str, date_str: str = "*") -> pl.DataFrame:
+        """
+        Loads feature dataset.
+        
+        date_str is a single day (YYYYMMDD) or a glob over day directories,
+        e.g. "202401*"; the default loads every day available for the coin.
+        """
+        pattern = f"{date_str}/{coin}_features.parquet"
+        files = sorted(self.features_dir.glob(pattern))
+        if not files:
+            raise FileNotFoundError(f"File not found: {self.features_dir / pattern}")
+        
+        # One scan over all days; sort by time to ensure chronological order.
+        # Stays in Polars: prepare_data hands sklearn NumPy arrays directly
+        return (
+            pl.scan_parquet(files)
+            .sort("timestamp", maintain_order=True)
+            .collect(engine="streaming")
+        )
 
-    def prepare_data(self, df: pd.DataFrame, target_col: str = "target"):
-        """Splits data into X and y, and drops non-feature columns."""
+    def prepare_data(self, df: pl.DataFrame, target_col: str = "target", dtype=np.float64):
+        """Splits data into X and y NumPy arrays, and drops non-feature columns."""
         # Drop metadata columns
         drop_cols = ["timestamp", "coin", target_col]
         feature_cols = [c for c in df.columns if c not in drop_cols]
         
-        X = df[feature_cols]
-        y = df[target_col]
+        # Single copy into a row-major block of the requested dtype, the layout
+        # the scaler keeps and the solvers expect, so no further conversion copies
+        if dtype == np.float32:
+            X = df.select(pl.col(feature_cols).cast(pl.Float32)).to_numpy(order="c")
+        else:
+            X = df.select(feature_cols).to_numpy(order="c")
+        y = df[target_col].to_numpy()
         
         return X, y
 
-    def train(self, df: pd.DataFrame):
+    def train(self, df: pl.DataFrame):
         """
         Trains the Logistic Regression model with chronological split.
         70% Train, 15% Val, 15% Test.
         """
-        X, y = self.prepare_data(df)
+        # saga consumes float32 directly: build X in float32 from the start so
+        # no float64 copy of the matrix is ever allocated
+        dtype = np.float32 if self.solver == "saga" else np.float64
+        X, y = self.prepare_data(df, dtype=dtype)
         
         n = len(df)
         train_end = int(n * 0.70)
         val_end = int(n * 0.85)
         
-        X_train, y_train = X.iloc[:train_end], y.iloc[:train_end]
-        X_val, y_val = X.iloc[train_end:val_end], y.iloc[train_end:val_end]
-        X_test, y_test = X.iloc[val_end:], y.iloc[val_end:]
+        X_train, y_train = X[:train_end], y[:train_end]
+        X_val, y_val = X[train_end:val_end], y[train_end:val_end]
+        X_test, y_test = X[val_end:], y[val_end:]
         
         logger.info(f"Train size: {len(X_train)}, Val size: {len(X_val)}, Test size: {len(X_test)}")
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_val_scaled = self.scaler.transform(X_val)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Scale features, in place: the splits are views of X, which is not
+        # used unscaled again. The scaler's statistics stay float64 either way.
+        self.scaler.fit(X_train)
+        X_train_scaled = self.scaler.transform(X_train, copy=False)
+        X_val_scaled = self.scaler.transform(X_val, copy=False)
+        X_test_scaled = self.scaler.transform(X_test, copy=False)
         
         # Train Model
         # Simple GridSearch for C parameter
@@ -78,8 +99,11 @@ class ModelTrainer:
         tscv = TimeSeriesSplit(n_splits=3)
         param_grid = {'C': [0.01, 0.1, 1, 10, 100]}
         
-        grid = GridSearchCV(LogisticRegression(class_weight='balanced', solver='liblinear'), 
-                            param_grid, cv=tscv, scoring='f1')
+        estimator = LogisticRegression(class_weight='balanced', solver=self.solver)
+        if self.solver == "saga":
+            estimator.set_params(max_iter=1000)
+        
+        grid = GridSearchCV(estimator, param_grid, cv=tscv, scoring='f1', n_jobs=self.n_jobs)
         
         logger.info("Starting Grid Search...")
         grid.fit(X_train_scaled, y_train)
@@ -117,12 +141,14 @@ class ModelTrainer:
         return {"accuracy": acc, "precision": prec, "recall": rec, "f1": f1, "auc": auc}
 
     def save_artifacts(self):
-        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         model_path = self.models_dir / f"lr_model_{timestamp}.pkl"
         scaler_path = self.models_dir / f"scaler_{timestamp}.pkl"
         
-        joblib.dump(self.model, model_path)
-        joblib.dump(self.scaler, scaler_path)
+        # Protocol 5 pickles the arrays out-of-band; left uncompressed so the
+        # backtester and live engine can memory-map them on load
+        joblib.dump(self.model, model_path, protocol=5)
+        joblib.dump(self.scaler, scaler_path, protocol=5)
         
         logger.info(f"Model saved to {model_path}")
         logger.info(f"Scaler saved to {scaler_path}")
@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+
+def latest_artifact(directory: Union[str, Path], prefix: str, suffix: str = ".pkl") -> Optional[os.DirEntry]:
+    """
+    Returns the newest model artifact named {prefix}<timestamp>{suffix}.
+    
+    Names carry the training timestamp (YYYYMMDD_HHMMSS), so the latest file
+    is the max name; one directory pass, no sort. Returns None if nothing matches.
+    """
+    with os.scandir(directory) as entries:
+        return max(
+            (entry for entry in entries
+             if entry.name.startswith(prefix) and entry.name.endswith(suffix)),
+            key=lambda entry: entry.name,
+            default=None,
+        )
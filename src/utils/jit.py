@@ -0,0 +1,16 @@
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        No-op stand-in for numba.njit when numba is not installed.
+
+        Supports both bare (@njit) and configured (@njit(cache=True)) usage,
+        returning the plain Python function unchanged.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -2,14 +2,17 @@ import boto3
 from botocore import UNSIGNED
 from botocore.config import Config
 
-def get_s3_client(unsigned: bool = True):
+def get_s3_client(unsigned: bool = True, max_pool_connections: int = 10):
     """
     Returns a boto3 S3 client.
     
     Args:
         unsigned (bool): If True, uses UNSIGNED signature (for public buckets).
+        max_pool_connections (int): Size of the client's connection pool; match
+            it to the number of threads sharing the client.
     """
     if unsigned:
-        return boto3.client('s3', config=Config(signature_version=UNSIGNED))
+        config = Config(signature_version=UNSIGNED, max_pool_connections=max_pool_connections)
     else:
-        return boto3.client('s3')
+        config = Config(max_pool_connections=max_pool_connections)
+    return boto3.client('s3', config=config)
@@ -2,6 +2,7 @@ import boto3
 from botocore import UNSIGNED
 from botocore.config import Config
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,14 +26,22 @@ def brute_force_paths():
         "market_data/l2Book/20231101/00/BTC.lz4",
     ]
     
-    for p in paths:
+    def probe(p):
+        # One shared client; boto3 clients are thread-safe
         logger.info(f"Trying {p}")
         try:
             s3.head_object(Bucket=bucket, Key=p)
-            logger.info(f"FOUND: {p}")
-            return
+            return None
         except Exception as e:
-            logger.info(f"Failed: {e}")
+            return e
+    
+    # Fire all HEADs at once, then report in list order
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        for p, error in zip(paths, executor.map(probe, paths)):
+            if error is None:
+                logger.info(f"FOUND: {p}")
+                return
+            logger.info(f"Failed: {error}")
 
 if __name__ == "__main__":
     brute_force_paths()
@@ -2,6 +2,7 @@ import boto3
 from botocore import UNSIGNED
 from botocore.config import Config
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,18 +32,26 @@ def test_direct_download():
         "market_data/2023-11-01/00/l2Book/SOL.lz4",
     ]
     
-    for key in keys_to_try:
+    def probe(key):
+        # One shared client; boto3 clients are thread-safe
         logger.info(f"Testing HEAD object for: {key}")
         try:
             s3.head_object(Bucket=bucket, Key=key)
-            logger.info(f"SUCCESS: Found {key}")
-            
-            # Try downloading small chunk
-            # s3.download_file(bucket, key, "test_download.lz4")
-            # logger.info("Download successful")
-            return
+            return None
         except Exception as e:
-            logger.info(f"Failed {key}: {e}")
+            return e
+    
+    # Fire all HEADs at once, then report in list order
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        for key, error in zip(keys_to_try, executor.map(probe, keys_to_try)):
+            if error is None:
+                logger.info(f"SUCCESS: Found {key}")
+                
+                # Try downloading small chunk
+                # s3.download_file(bucket, key, "test_download.lz4")
+                # logger.info("Download successful")
+                return
+            logger.info(f"Failed {key}: {error}")
 
 if __name__ == "__main__":
     test_direct_download()
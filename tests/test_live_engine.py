@@ -0,0 +1,58 @@
+"""
+Test script for LiveEngine feature extraction on hand-written books.
+"""
+
+import tempfile
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from src.live.engine import FEATURE_COLUMNS, LiveEngine
+
+
+def _engine(models_dir):
+    # Tiny stand-in model, only so the engine can load its artifacts
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(20, len(FEATURE_COLUMNS)))
+    y = np.arange(20) % 2
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    joblib.dump(model, f"{models_dir}/lr_model_20240101_000000.pkl")
+    joblib.dump(scaler, f"{models_dir}/scaler_20240101_000000.pkl")
+    return LiveEngine(coin="SOL", models_dir=models_dir)
+
+
+def _book(bid_sz, ask_sz):
+    return {
+        "coin": "SOL",
+        "time": 0,
+        "levels": [
+            [{"px": "100.0", "sz": bid_sz, "n": 1}],
+            [{"px": "100.2", "sz": ask_sz, "n": 1}],
+        ],
+    }
+
+
+def test_zero_size_top_of_book():
+    with tempfile.TemporaryDirectory() as models_dir:
+        engine = _engine(models_dir)
+        
+        # Both best sizes 0: skipped instead of raising ZeroDivisionError
+        assert engine.process_snapshot(_book("0", "0")) is None
+        assert engine.last_mid is None
+        
+        features = engine.process_snapshot(_book("1.0", "3.0"))
+        assert features is not None
+        assert features[FEATURE_COLUMNS.index("imbalance_1")] == -0.5
+
+
+def main():
+    print("Testing LiveEngine...")
+    test_zero_size_top_of_book()
+    print("Test completed!")
+
+
+if __name__ == "__main__":
+    main()
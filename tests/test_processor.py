@@ -0,0 +1,70 @@
+"""
+Test script for DataProcessor on small hand-written L2 files.
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import orjson
+import polars as pl
+
+from src.data.processor import DataProcessor
+
+DATE = datetime(2024, 1, 1)
+LEVELS = [[{"px": "100.0", "sz": "1.5", "n": 1}], [{"px": "100.1", "sz": "2.0", "n": 1}]]
+
+
+def _snapshots(hour, key="time"):
+    start = int(DATE.timestamp() * 1000) + hour * 3_600_000
+    return [{"coin": "SOL", key: start + i * 60_000, "levels": LEVELS} for i in range(3)]
+
+
+def _write_hour(raw_dir, hour, payload):
+    hour_dir = Path(raw_dir) / "l2Book" / DATE.strftime("%Y%m%d") / f"{hour:02d}"
+    hour_dir.mkdir(parents=True, exist_ok=True)
+    (hour_dir / "SOL.json").write_bytes(payload)
+
+
+def _ndjson(rows):
+    return b"\n".join(orjson.dumps(r) for r in rows) + b"\n"
+
+
+def _process(raw_dir):
+    out_dir = Path(raw_dir) / "processed"
+    DataProcessor(raw_dir=raw_dir, processed_dir=str(out_dir)).process_l2_day("SOL", DATE)
+    return pl.read_parquet(out_dir / "l2Book" / DATE.strftime("%Y%m%d") / "SOL.parquet")
+
+
+def test_timestamp_key():
+    # Snapshots keyed "timestamp" instead of "time", as a JSON array and as NDJSON
+    with tempfile.TemporaryDirectory() as raw:
+        _write_hour(raw, 0, orjson.dumps(_snapshots(0, key="timestamp")))
+        _write_hour(raw, 1, _ndjson(_snapshots(1, key="timestamp")))
+        df = _process(raw)
+        
+        expected = [s["timestamp"] for h in (0, 1) for s in _snapshots(h, key="timestamp")]
+        assert df["timestamp"].null_count() == 0
+        assert df["timestamp"].dt.epoch("ms").to_list() == expected
+        assert df["levels"].list.get(0).list.first().struct.field("px").to_list() == [100.0] * 6
+
+
+def test_corrupt_ndjson_hour_skipped():
+    # One readable and one corrupt NDJSON hour: the day is still written
+    with tempfile.TemporaryDirectory() as raw:
+        _write_hour(raw, 0, _ndjson(_snapshots(0)))
+        _write_hour(raw, 1, b"{not json\n")
+        df = _process(raw)
+        
+        assert df["time"].to_list() == [s["time"] for s in _snapshots(0)]
+
+
+def main():
+    print("Testing DataProcessor...")
+    test_timestamp_key()
+    test_corrupt_ndjson_hour_skipped()
+    print("Test completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Test script for snapshot storage: published files keep the usual mode.
+"""
+
+import os
+import stat
+import tempfile
+
+from src.api_downloader.storage import save_snapshot, save_snapshot_stream
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_published_snapshot_mode():
+    umask = os.umask(0o022)
+    try:
+        with tempfile.TemporaryDirectory() as out:
+            saved = save_snapshot("SOL", "20240101", 0, b"[]", output_dir=out)
+            assert _mode(saved) == 0o644, oct(_mode(saved))
+            
+            streamed = save_snapshot_stream(
+                "SOL", "20240101", 1, lambda f: f.write(b"[]") > 0, output_dir=out
+            )
+            assert _mode(streamed) == 0o644, oct(_mode(streamed))
+            
+            # Only the published files are left, no temporaries
+            assert sorted(os.listdir(saved.parent)) == ["00.json", "01.json"]
+    finally:
+        os.umask(umask)
+
+
+def main():
+    print("Testing snapshot storage...")
+    test_published_snapshot_mode()
+    print("Test completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ def main():
         equity, trades = backtester.run_backtest(coin, date_str)
         
         print("\n--- Backtest Results ---")
-        print(f"Final Equity: {equity.iloc[-1]['equity']:.2f}")
+        print(f"Final Equity: {equity['equity'].iat[-1]:.2f}")
         print(f"Total Trades: {len(trades)}")
         if not trades.empty:
             print("\nTrade Log:")
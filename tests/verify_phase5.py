@@ -1,6 +1,5 @@
-from src.live.engine import LiveEngine
-import threading
-import time
+from src.live.engine import LiveEngine, run_event_loop
+import asyncio
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -10,16 +9,15 @@ def main():
     try:
         engine = LiveEngine(coin="SOL")
         
-        # Run in a separate thread so we can stop it
-        t = threading.Thread(target=engine.run)
-        t.daemon = True
-        t.start()
-        
+        # Run on this thread's event loop; the timeout cancels the engine,
+        # which closes the connector on its way out
         print("Running for 10 seconds...")
-        time.sleep(10)
+        try:
+            run_event_loop(asyncio.wait_for(engine.run(), timeout=10))
+        except asyncio.TimeoutError:
+            pass
         
         print("Stopping...")
-        engine.connector.stop()
         
     except Exception as e:
         print(f"Error: {e}")